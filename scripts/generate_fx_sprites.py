@@ -1,210 +1,287 @@
 """
 폭발 이펙트 스프라이트 생성기
-4프레임 물리 히트 이펙트 (fx_hit_physical_0 ~ fx_hit_physical_3)
+물리 히트 이펙트 (기본 4프레임: fx_hit_physical_0 ~ fx_hit_physical_3)
 카툰 스타일 — 오렌지/레드/옐로우 폭발
+
+NumPy 렌더러: 거리/각도 격자 위에서 그라데이션 원, 스파이크, 파편을 배열 연산으로 계산하고
+모든 프레임을 (프레임, y, x) 배열 하나로 한 번에 그린다. 난수는 시드 고정 Generator로
+한꺼번에 뽑으므로 같은 인자면 항상 같은 결과가 나온다.
+
+프레임 파라미터는 EXPLOSION_KEYS(128px 기준 4개 키프레임)를 진행도에 따라 보간하므로
+프레임 수/크기를 바꿔도 같은 폭발 모양이 유지된다.
+
+사용법:
+  python scripts/generate_fx_sprites.py                        → 128px 4프레임
+  python scripts/generate_fx_sprites.py --size 256 --frames 8  → 256px 8프레임
+  python scripts/generate_fx_sprites.py --seed 7 --prefix fx_hit_big
 """
 
-from PIL import Image, ImageDraw, ImageFilter
-import math
-import random
 import os
-
-# 시드 고정 (재현성)
-random.seed(42)
+import time
+import argparse
+import numpy as np
+from PIL import Image
+from scipy import ndimage
 
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'assets', 'images', 'fx')
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-SIZE = 128  # 각 프레임 크기
-
-
-def radial_gradient(draw, center, radius, color_inner, color_outer, alpha_inner=255, alpha_outer=0):
-    """방사형 그라데이션 원 그리기"""
-    for r in range(int(radius), 0, -1):
-        ratio = r / radius
-        # 색상 보간
-        red = int(color_outer[0] * ratio + color_inner[0] * (1 - ratio))
-        green = int(color_outer[1] * ratio + color_inner[1] * (1 - ratio))
-        blue = int(color_outer[2] * ratio + color_inner[2] * (1 - ratio))
-        alpha = int(alpha_outer * ratio + alpha_inner * (1 - ratio))
-        
-        bbox = [center[0] - r, center[1] - r, center[0] + r, center[1] + r]
-        draw.ellipse(bbox, fill=(red, green, blue, alpha))
-
-
-def draw_spike(draw, cx, cy, angle, length, width, color):
-    """방사형 스파이크 (뾰족한 광선)"""
-    end_x = cx + math.cos(angle) * length
-    end_y = cy + math.sin(angle) * length
-    perp_angle = angle + math.pi / 2
-    half_w = width / 2
-    
-    points = [
-        (cx + math.cos(perp_angle) * half_w, cy + math.sin(perp_angle) * half_w),
-        (end_x, end_y),
-        (cx - math.cos(perp_angle) * half_w, cy - math.sin(perp_angle) * half_w),
-    ]
-    draw.polygon(points, fill=color)
-
-
-def draw_debris(draw, cx, cy, count, max_dist, size_range=(2, 5)):
-    """파편/잔해 점 그리기"""
-    colors = [
-        (255, 100, 30, 230),
-        (200, 60, 20, 200),
-        (255, 160, 50, 180),
-        (180, 40, 10, 160),
-    ]
-    for _ in range(count):
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(max_dist * 0.4, max_dist)
-        x = cx + math.cos(angle) * dist
-        y = cy + math.sin(angle) * dist
-        s = random.randint(size_range[0], size_range[1])
-        color = random.choice(colors)
-        draw.ellipse([x - s, y - s, x + s, y + s], fill=color)
-
-
-def generate_frame_0():
-    """프레임 0: 초기 임팩트 — 밝은 별 모양 섬광"""
-    img = Image.new('RGBA', (SIZE, SIZE), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    cx, cy = SIZE // 2, SIZE // 2
-    
-    # 외곽 글로우
-    radial_gradient(draw, (cx, cy), 30, (255, 200, 50), (255, 100, 0), 200, 0)
-    
-    # 스파이크 (8방향)
-    for i in range(8):
-        angle = (i / 8) * math.pi * 2
-        length = 25 + random.uniform(0, 15)
-        width = 4 + random.uniform(0, 3)
-        color = (255, 220, 80, 220) if i % 2 == 0 else (255, 160, 30, 200)
-        draw_spike(draw, cx, cy, angle, length, width, color)
-    
-    # 중심 밝은 핵
-    radial_gradient(draw, (cx, cy), 12, (255, 255, 255), (255, 230, 100), 255, 180)
-    
-    # 약간의 블러
-    img = img.filter(ImageFilter.GaussianBlur(radius=0.8))
-    
-    return img
-
-
-def generate_frame_1():
-    """프레임 1: 확장 — 오렌지 불꽃 구름 + 스파크"""
-    img = Image.new('RGBA', (SIZE, SIZE), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    cx, cy = SIZE // 2, SIZE // 2
-    
-    # 외곽 오렌지 구름
-    for _ in range(6):
-        ox = cx + random.randint(-15, 15)
-        oy = cy + random.randint(-15, 15)
-        r = random.randint(18, 28)
-        radial_gradient(draw, (ox, oy), r, (255, 140, 40), (200, 60, 10), 200, 30)
-    
-    # 스파이크 (짧고 많은)
-    for i in range(12):
-        angle = (i / 12) * math.pi * 2 + random.uniform(-0.2, 0.2)
-        length = 20 + random.uniform(0, 20)
-        width = 3 + random.uniform(0, 2)
-        draw_spike(draw, cx, cy, angle, length, width, (255, 180, 50, 180))
-    
+
+SIZE = 128     # 각 프레임 크기 (EXPLOSION_KEYS 수치의 기준 크기)
+FRAMES = 4
+SEED = 42      # 시드 고정 (재현성)
+PREFIX = 'fx_hit_physical'
+
+# 그라데이션 원: (안쪽 색, 바깥 색, 안쪽 알파, 바깥 알파)
+# 키프레임 4개 = 초기 임팩트 → 확장 → 최대 크기 → 최대 확장 (개수 0 = 그 레이어 없음)
+EXPLOSION_KEYS = [
+    {   # 프레임 0: 초기 임팩트 — 밝은 별 모양 섬광
+        'glow_r': 30, 'glow': ((255, 200, 50), (255, 100, 0), 200, 0),
+        'clouds': 0, 'cloud_spread': 15, 'cloud_r': (18, 28), 'cloud': ((255, 140, 40), (200, 60, 10), 200, 30),
+        'flames': 0, 'flame_spread': 10, 'flame_r': (15, 22), 'flame': ((255, 180, 60), (255, 120, 30), 230, 60),
+        'spikes': 8, 'spike_jitter': 0.0, 'spike_len': (25, 15), 'spike_w': (4, 3),
+        'spike_color': (255, 220, 80, 220), 'spike_color2': (255, 160, 30, 200),
+        'core_r': 12, 'core': ((255, 255, 255), (255, 230, 100), 255, 180),
+        'debris': 0, 'debris_dist': 35, 'debris_size': (2, 5),
+        'blur': 0.8,
+    },
+    {   # 프레임 1: 확장 — 오렌지 불꽃 구름 + 스파크
+        'glow_r': 0, 'glow': ((255, 200, 50), (255, 100, 0), 200, 0),
+        'clouds': 6, 'cloud_spread': 15, 'cloud_r': (18, 28), 'cloud': ((255, 140, 40), (200, 60, 10), 200, 30),
+        'flames': 0, 'flame_spread': 10, 'flame_r': (15, 22), 'flame': ((255, 180, 60), (255, 120, 30), 230, 60),
+        'spikes': 12, 'spike_jitter': 0.2, 'spike_len': (20, 20), 'spike_w': (3, 2),
+        'spike_color': (255, 180, 50, 180), 'spike_color2': (255, 180, 50, 180),
+        'core_r': 16, 'core': ((255, 255, 230), (255, 200, 60), 255, 100),
+        'debris': 12, 'debris_dist': 35, 'debris_size': (2, 5),
+        'blur': 1.0,
+    },
+    {   # 프레임 2: 최대 크기 — 큰 불꽃 구름
+        'glow_r': 0, 'glow': ((255, 200, 50), (255, 100, 0), 200, 0),
+        'clouds': 8, 'cloud_spread': 18, 'cloud_r': (22, 35), 'cloud': ((220, 100, 30), (150, 40, 10), 220, 20),
+        'flames': 5, 'flame_spread': 10, 'flame_r': (15, 22), 'flame': ((255, 180, 60), (255, 120, 30), 230, 60),
+        'spikes': 10, 'spike_jitter': 0.15, 'spike_len': (25, 25), 'spike_w': (3, 3),
+        'spike_color': (255, 150, 30, 160), 'spike_color2': (255, 150, 30, 160),
+        'core_r': 14, 'core': ((255, 255, 240), (255, 200, 80), 255, 80),
+        'debris': 18, 'debris_dist': 45, 'debris_size': (2, 6),
+        'blur': 1.2,
+    },
+    {   # 프레임 3: 최대 확장 — 가장 큰 폭발 + 흩어지는 파편 (핵은 소멸 시작)
+        'glow_r': 0, 'glow': ((255, 200, 50), (255, 100, 0), 200, 0),
+        'clouds': 10, 'cloud_spread': 22, 'cloud_r': (25, 40), 'cloud': ((200, 80, 20), (120, 30, 5), 200, 10),
+        'flames': 6, 'flame_spread': 12, 'flame_r': (18, 25), 'flame': ((255, 160, 50), (230, 100, 20), 210, 40),
+        'spikes': 14, 'spike_jitter': 0.3, 'spike_len': (30, 25), 'spike_w': (2, 3),
+        'spike_color': (255, 130, 20, 150), 'spike_color2': (255, 130, 20, 150),
+        'core_r': 12, 'core': ((255, 240, 200), (255, 180, 60), 240, 60),
+        'debris': 25, 'debris_dist': 55, 'debris_size': (1, 5),
+        'blur': 1.5,
+    },
+]
+
+# 파편 색상 팔레트
+DEBRIS_COLORS = np.array([
+    (255, 100, 30, 230),
+    (200, 60, 20, 200),
+    (255, 160, 50, 180),
+    (180, 40, 10, 160),
+], dtype=np.float32)
+
+COUNT_KEYS = ('clouds', 'flames', 'spikes', 'debris')
+
+
+def _lerp(a, b, w):
+    if isinstance(a, (tuple, list)):
+        return tuple(_lerp(x, y, w) for x, y in zip(a, b))
+    return a + (b - a) * w
+
+
+def frame_params(frames, keys=EXPLOSION_KEYS):
+    """키프레임 → 프레임 수만큼 선형 보간한 파라미터 목록 (개수 항목은 반올림)"""
+    out = []
+    for i in range(frames):
+        pos = i / (frames - 1) * (len(keys) - 1) if frames > 1 else 0.0
+        j = min(int(pos), len(keys) - 2)
+        p = {k: _lerp(keys[j][k], keys[j + 1][k], pos - j) for k in keys[j]}
+        for k in COUNT_KEYS:
+            p[k] = int(round(p[k]))
+        out.append(p)
+    return out
+
+
+def _stack(params, key):
+    """프레임별 파라미터 → (F, ...) 배열"""
+    return np.array([p[key] for p in params], dtype=np.float32)
+
+
+def _uniform(rng, lo, hi, shape):
+    return rng.uniform(lo, hi, shape).astype(np.float32)
+
+
+def _valid(params, key, kmax):
+    """(F, K) — k < 그 프레임의 개수"""
+    return np.arange(kmax)[None, :] < np.array([p[key] for p in params])[:, None]
+
+
+def _patch(cx, cy, h):
+    """(F,K) 중심마다 (2h+1)² 패치 → 패치 원점 x0, y0 (정수) + 픽셀 중심의 중심 기준 좌표 lx (F,K,1,P), ly (F,K,P,1)"""
+    o = np.arange(2 * h + 1, dtype=np.float32)
+    x0 = np.floor(cx).astype(np.int64) - h
+    y0 = np.floor(cy).astype(np.int64) - h
+    lx = (x0[..., None] + o + 0.5 - cx[..., None]).astype(np.float32)[..., None, :]
+    ly = (y0[..., None] + o + 0.5 - cy[..., None]).astype(np.float32)[..., :, None]
+    return x0, y0, lx, ly
+
+
+def _gradient_layer(cx, cy, r, spec, valid):
+    """그라데이션 원 K개 (안쪽→바깥 색/알파 선형 보간, 가장자리 안티앨리어싱) → (x0, y0, 알파, 색)
+    cx, cy, r: (F,K), spec: 프레임별 (안쪽 색, 바깥 색, 안쪽 알파, 바깥 알파), valid: (F,K)"""
+    x0, y0, lx, ly = _patch(cx, cy, int(np.ceil(r.max())) + 1)
+    dist = np.hypot(lx, ly)
+    r = np.maximum(r, 1e-3)[..., None, None]
+    ratio = np.minimum(dist / r, 1)
+    inner, outer = (np.array([sp[i] for sp in spec], dtype=np.float32)[:, None, None, None, :] for i in (0, 1))
+    a_in, a_out = (np.array([sp[i] for sp in spec], dtype=np.float32)[:, None, None, None] / 255 for i in (2, 3))
+    cover = np.clip(r - dist + 0.5, 0, 1) * valid[..., None, None]
+    a = (a_in + (a_out - a_in) * ratio) * cover
+    return x0, y0, a, inner + (outer - inner) * ratio[..., None]
+
+
+def _paint(canvas, alpha, layer, pad):
+    """premultiplied 캔버스 위에 패치 레이어 K개를 k 순서대로 덮음
+    layer: (x0, y0 (F,K), 알파 (F,K,P,P), 색 (F,K,P,P,3) 또는 (F,K,3))"""
+    x0, y0, a, color = layer
+    frames, kmax, size = a.shape[:3]
+    live = a.reshape(frames, kmax, -1).max(axis=2) > 0      # 비어 있는 도형(개수 밖)은 건너뜀
+    for f, k in zip(*np.nonzero(live)):
+        ys = slice(y0[f, k] + pad, y0[f, k] + pad + size)
+        xs = slice(x0[f, k] + pad, x0[f, k] + pad + size)
+        ak = a[f, k]
+        ck = color[f, k] if color.ndim == 5 else color[f, k, None, None, :]
+        dst = canvas[f, ys, xs]
+        dst *= (1 - ak)[..., None]
+        dst += ck * ak[..., None]
+        dst = alpha[f, ys, xs]
+        dst *= 1 - ak
+        dst += ak
+
+
+def render_explosion(frames=FRAMES, size=SIZE, seed=SEED, keys=EXPLOSION_KEYS):
+    """폭발 전체 프레임을 한 번에 렌더링 → PIL RGBA 이미지 목록
+
+    레이어(글로우 → 구름 → 불꽃 → 스파이크 → 핵 → 파편)마다 모든 프레임의 도형 K개를
+    (프레임, 도형, 패치 y, 패치 x) 배열 하나로 계산하고, 도형 순서대로 캔버스에 덮는다.
+    패치는 도형을 감싸는 크기라 해상도/프레임 수가 늘어도 비용은 도형 면적만큼만 는다."""
+    rng = np.random.default_rng(seed)
+    params = frame_params(frames, keys)
+    unit = size / SIZE                      # 128px 기준 수치 → 실제 픽셀
+    c = size / 2
+    center = np.full((frames, 1), c, dtype=np.float32)
+    layers = []
+
+    def centered(r_key, spec_key):
+        r = _stack(params, r_key)[:, None] * unit
+        if r.max() > 0:
+            layers.append(_gradient_layer(center, center, r, [p[spec_key] for p in params], r > 0))
+
+    def blobs(count_key, spread_key, r_key, spec_key):
+        kmax = max(p[count_key] for p in params)
+        if kmax == 0:
+            return
+        spread = _stack(params, spread_key)[:, None] * unit
+        r_lo, r_hi = (_stack(params, r_key) * unit).T
+        ox = c + _uniform(rng, -1, 1, (frames, kmax)) * spread
+        oy = c + _uniform(rng, -1, 1, (frames, kmax)) * spread
+        r = r_lo[:, None] + _uniform(rng, 0, 1, (frames, kmax)) * (r_hi - r_lo)[:, None]
+        layers.append(_gradient_layer(ox, oy, r, [p[spec_key] for p in params],
+                                      _valid(params, count_key, kmax)))
+
+    # 외곽 글로우 → 외곽 구름 → 중간 불꽃
+    centered('glow_r', 'glow')
+    blobs('clouds', 'cloud_spread', 'cloud_r', 'cloud')
+    blobs('flames', 'flame_spread', 'flame_r', 'flame')
+
+    # 스파이크: 각 방향 축 좌표 u(길이 방향), v(옆 방향)로 삼각형 판정
+    kmax = max(p['spikes'] for p in params)
+    if kmax:
+        count = np.array([max(p['spikes'], 1) for p in params], dtype=np.float32)[:, None]
+        angle = (np.arange(kmax)[None, :] / count * 2 * np.pi
+                 + _uniform(rng, -1, 1, (frames, kmax)) * _stack(params, 'spike_jitter')[:, None])
+        base_len, var_len = (_stack(params, 'spike_len') * unit).T
+        base_w, var_w = (_stack(params, 'spike_w') * unit).T
+        length = base_len[:, None] + _uniform(rng, 0, 1, (frames, kmax)) * var_len[:, None]
+        width = base_w[:, None] + _uniform(rng, 0, 1, (frames, kmax)) * var_w[:, None]
+        # 패치는 스파이크 중점 기준 (길이 방향 절반 + 폭만 덮으면 됨)
+        cos, sin = np.cos(angle), np.sin(angle)
+        x0, y0, lx, ly = _patch(c + cos * length / 2, c + sin * length / 2,
+                                int(np.ceil(length.max() / 2 + width.max())) + 2)
+        cos, sin = cos[..., None, None], sin[..., None, None]
+        u = lx * cos + ly * sin + length[..., None, None] / 2
+        v = np.abs(-lx * sin + ly * cos)
+        L = length[..., None, None]
+        half = width[..., None, None] / 2 * np.clip(1 - u / L, 0, 1)
+        cover = np.clip(half - v + 0.5, 0, 1) * np.clip(u + 0.5, 0, 1) * np.clip(L - u + 0.5, 0, 1)
+        odd = (np.arange(kmax) % 2 == 1)[None, :, None]
+        rgba = np.where(odd, _stack(params, 'spike_color2')[:, None], _stack(params, 'spike_color')[:, None])
+        a = rgba[..., 3][..., None, None] / 255 * cover * _valid(params, 'spikes', kmax)[..., None, None]
+        layers.append((x0, y0, a, rgba[..., :3]))
+
     # 중심 밝은 핵
-    radial_gradient(draw, (cx, cy), 16, (255, 255, 230), (255, 200, 60), 255, 100)
-    
-    # 파편
-    draw_debris(draw, cx, cy, 12, 35)
-    
-    img = img.filter(ImageFilter.GaussianBlur(radius=1.0))
-    
-    return img
-
-
-def generate_frame_2():
-    """프레임 2: 최대 크기 — 큰 불꽃 구름"""
-    img = Image.new('RGBA', (SIZE, SIZE), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    cx, cy = SIZE // 2, SIZE // 2
-    
-    # 큰 외곽 구름 (다크 레드)
-    for _ in range(8):
-        ox = cx + random.randint(-18, 18)
-        oy = cy + random.randint(-18, 18)
-        r = random.randint(22, 35)
-        radial_gradient(draw, (ox, oy), r, (220, 100, 30), (150, 40, 10), 220, 20)
-    
-    # 중간 오렌지 레이어
-    for _ in range(5):
-        ox = cx + random.randint(-10, 10)
-        oy = cy + random.randint(-10, 10)
-        r = random.randint(15, 22)
-        radial_gradient(draw, (ox, oy), r, (255, 180, 60), (255, 120, 30), 230, 60)
-    
-    # 스파이크 (방사형)
-    for i in range(10):
-        angle = (i / 10) * math.pi * 2 + random.uniform(-0.15, 0.15)
-        length = 25 + random.uniform(0, 25)
-        width = 3 + random.uniform(0, 3)
-        draw_spike(draw, cx, cy, angle, length, width, (255, 150, 30, 160))
-    
-    # 밝은 핵
-    radial_gradient(draw, (cx, cy), 14, (255, 255, 240), (255, 200, 80), 255, 80)
-    
-    # 파편 (더 많이, 멀리)
-    draw_debris(draw, cx, cy, 18, 45, (2, 6))
-    
-    img = img.filter(ImageFilter.GaussianBlur(radius=1.2))
-    
-    return img
-
-
-def generate_frame_3():
-    """프레임 3: 최대 확장 — 가장 큰 폭발 + 흩어지는 파편"""
-    img = Image.new('RGBA', (SIZE, SIZE), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
-    cx, cy = SIZE // 2, SIZE // 2
-    
-    # 가장 큰 외곽 폭발 구름
-    for _ in range(10):
-        ox = cx + random.randint(-22, 22)
-        oy = cy + random.randint(-22, 22)
-        r = random.randint(25, 40)
-        radial_gradient(draw, (ox, oy), r, (200, 80, 20), (120, 30, 5), 200, 10)
-    
-    # 오렌지 불꽃 중간층
-    for _ in range(6):
-        ox = cx + random.randint(-12, 12)
-        oy = cy + random.randint(-12, 12)
-        r = random.randint(18, 25)
-        radial_gradient(draw, (ox, oy), r, (255, 160, 50), (230, 100, 20), 210, 40)
-    
-    # 스파이크 (많고 길게)
-    for i in range(14):
-        angle = (i / 14) * math.pi * 2 + random.uniform(-0.3, 0.3)
-        length = 30 + random.uniform(0, 25)
-        width = 2 + random.uniform(0, 3)
-        draw_spike(draw, cx, cy, angle, length, width, (255, 130, 20, 150))
-    
-    # 밝은 핵 (약간 작아짐 — 소멸 시작)
-    radial_gradient(draw, (cx, cy), 12, (255, 240, 200), (255, 180, 60), 240, 60)
-    
-    # 파편 (가장 많이, 가장 멀리)
-    draw_debris(draw, cx, cy, 25, 55, (1, 5))
-    
-    img = img.filter(ImageFilter.GaussianBlur(radius=1.5))
-    
-    return img
+    centered('core_r', 'core')
 
+    # 파편: 링 안의 무작위 위치에 작은 원
+    kmax = max(p['debris'] for p in params)
+    if kmax:
+        dist_max = _stack(params, 'debris_dist')[:, None] * unit
+        s_lo, s_hi = (_stack(params, 'debris_size') * unit).T
+        theta = _uniform(rng, 0, 2 * np.pi, (frames, kmax))
+        d = dist_max * _uniform(rng, 0.4, 1.0, (frames, kmax))
+        s = s_lo[:, None] + _uniform(rng, 0, 1, (frames, kmax)) * (s_hi - s_lo)[:, None]
+        rgba = DEBRIS_COLORS[rng.integers(0, len(DEBRIS_COLORS), (frames, kmax))]
+        x0, y0, lx, ly = _patch(c + np.cos(theta) * d, c + np.sin(theta) * d, int(np.ceil(s.max())) + 1)
+        cover = np.clip(s[..., None, None] - np.hypot(lx, ly) + 0.5, 0, 1)
+        a = rgba[..., 3][..., None, None] / 255 * cover * _valid(params, 'debris', kmax)[..., None, None]
+        layers.append((x0, y0, a, rgba[..., :3]))
 
-if __name__ == '__main__':
-    generators = [generate_frame_0, generate_frame_1, generate_frame_2, generate_frame_3]
-    
-    for i, gen in enumerate(generators):
-        frame = gen()
-        path = os.path.join(OUTPUT_DIR, f'fx_hit_physical_{i}.png')
+    # 패치가 캔버스 밖으로 나가도 되도록 여백을 두고 그린 뒤 잘라냄
+    pad = max([0] + [int(max(-x0.min(), -y0.min(), (x0 + a.shape[-1]).max() - size,
+                            (y0 + a.shape[-1]).max() - size)) for x0, y0, a, _ in layers])
+    canvas = np.zeros((frames, size + 2 * pad, size + 2 * pad, 3), dtype=np.float32)   # premultiplied RGB
+    alpha = np.zeros((frames, size + 2 * pad, size + 2 * pad), dtype=np.float32)
+    for layer in layers:
+        _paint(canvas, alpha, layer, pad)
+    canvas = canvas[:, pad:pad + size, pad:pad + size]
+    alpha = alpha[:, pad:pad + size, pad:pad + size]
+
+    # 프레임별 블러 (premultiplied 상태에서)
+    for f, p in enumerate(params):
+        sigma = p['blur'] * unit
+        canvas[f] = ndimage.gaussian_filter(canvas[f], (sigma, sigma, 0))
+        alpha[f] = ndimage.gaussian_filter(alpha[f], sigma)
+
+    rgb = canvas / np.maximum(alpha, 1e-6)[..., None]
+    out = np.concatenate([rgb, alpha[..., None] * 255], axis=-1)
+    out = np.clip(out, 0, 255).round().astype(np.uint8)
+    return [Image.fromarray(frame, 'RGBA') for frame in out]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=FRAMES)
+    parser.add_argument('--size', type=int, default=SIZE)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--prefix', type=str, default=PREFIX)
+    parser.add_argument('--out', type=str, default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    t = time.perf_counter()
+    frames = render_explosion(args.frames, args.size, args.seed)
+    elapsed = time.perf_counter() - t
+
+    for i, frame in enumerate(frames):
+        path = os.path.join(args.out, f'{args.prefix}_{i}.png')
         frame.save(path)
         print(f'✅ 저장: {path} ({frame.size[0]}x{frame.size[1]})')
-    
-    print(f'\n🎉 물리 히트 이펙트 4프레임 생성 완료! → {OUTPUT_DIR}')
+
+    print(f'\n🎉 물리 히트 이펙트 {len(frames)}프레임 생성 완료! ({elapsed:.2f}초) → {args.out}')
+
+
+if __name__ == '__main__':
+    main()
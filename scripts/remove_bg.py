@@ -3,6 +3,7 @@
 AI 생성 이미지에서 반투명 배경(안개/흰색 그라데이션)을 완전 투명으로 변환합니다.
 
 사용법: python scripts/remove_bg.py
+덮어쓰는 파일만 스냅샷 저장소에 기록 (tools/snapshot_store.py restore <이름>으로 복원)
 """
 
 import os
@@ -10,11 +11,12 @@ import sys
 from pathlib import Path
 from PIL import Image
 import numpy as np
-import shutil
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+from snapshot_store import SnapshotStore
 
 # 설정
 ASSETS_DIR = Path(__file__).parent.parent / "assets" / "images"
-BACKUP_DIR = Path(__file__).parent.parent / "assets" / "images_backup"
 
 # 처리 대상 폴더 (fx 포함 — 마스터 요청)
 TARGET_FOLDERS = ["enemies", "heroes", "towers", "projectiles", "objects", "fx", "soldiers", "portraits", "ui"]
@@ -58,58 +60,61 @@ def get_dominant_bg_color(img_array: np.ndarray) -> np.ndarray:
     return all_samples[:, :3].mean(axis=0).astype(np.uint8)
 
 
-def remove_semi_transparent_bg(img: Image.Image) -> Image.Image:
-    """반투명 배경을 완전 투명으로 변환"""
+def _fog_alpha_lut() -> np.ndarray:
+    """(알파 0~255, 밝기합 R+G+B 0~765) → 새 알파 LUT
+    이전 float32 구현과 똑같은 연산(평균 밝기 → fade → alpha * (1 - fade) → 버림)으로 미리 계산"""
+    rgb = np.zeros((766, 3), dtype=np.float32)
+    rgb[:, 0] = np.arange(766)
+    brightness = rgb.mean(axis=1)
+    fade_factor = np.clip((brightness - 150) / 105, 0, 0.7)
+    alpha = np.arange(256, dtype=np.float32)[:, None]
+    lut = np.clip(alpha * (1.0 - fade_factor), 0, 255).astype(np.uint8)
+    lut[:30] = 0                                                   # 거의 투명 → 완전 투명
+    lut[ALPHA_THRESHOLD:] = np.arange(ALPHA_THRESHOLD, 256)[:, None]  # 불투명 → 그대로
+    return lut
+
+FOG_ALPHA_LUT = _fog_alpha_lut()
+TILE_ROWS = 256             # 한 번에 처리하는 행 수 (임시 배열 메모리 상한)
+
+
+def _remove_fog_tile(tile: np.ndarray):
+    """RGBA uint8 타일의 알파를 제자리 갱신 (방법 1 + 2). 알파 >= ALPHA_THRESHOLD는 그대로."""
+    alpha = tile[:, :, 3]
+    low = alpha < ALPHA_THRESHOLD
+    if not low.any():
+        return
+    r, g, b = tile[:, :, 0], tile[:, :, 1], tile[:, :, 2]
+    total = r.astype(np.uint16)
+    total += g
+    total += b
+    saturation = np.maximum(np.maximum(r, g), b) - np.minimum(np.minimum(r, g), b)
+    # 밝고(평균 > 180) 채도 낮은 반투명 = 배경 안개
+    fog = low & (alpha >= 30) & (total > 540) & (saturation < 50)
+    index = alpha.astype(np.uint32)
+    index *= 766
+    index += total
+    np.copyto(alpha, FOG_ALPHA_LUT.take(index), where=low)
+    alpha[fog] = 0
+
+
+def remove_semi_transparent_bg(img: Image.Image, tile_rows: int = TILE_ROWS) -> Image.Image:
+    """반투명 배경을 완전 투명으로 변환
+    uint8 배열 하나를 제자리에서 고치고, 알파 계산은 tile_rows행씩 나눠서 한다
+    (큰 이미지도 임시 배열은 타일 크기만큼만)."""
     if img.mode != "RGBA":
         img = img.convert("RGBA")
     
-    arr = np.array(img, dtype=np.float32)
-    alpha = arr[:, :, 3]
-    rgb = arr[:, :, :3]
+    arr = np.array(img)
+    h, w = arr.shape[:2]
     
     # 방법 1: 매우 낮은 알파(거의 투명) → 완전 투명으로
-    very_low_alpha = alpha < 30
-    arr[very_low_alpha, 3] = 0
-    
-    # 방법 2: 중간 알파(반투명 영역) 분석
-    # 빈 공간(내용이 없는 영역)의 반투명 픽셀을 투명으로
-    # 핵심: 밝고 채도 낮은 반투명 픽셀 = 배경 안개
-    medium_alpha = (alpha >= 30) & (alpha < ALPHA_THRESHOLD)
+    # 방법 2: 중간 알파(반투명 영역) 중 밝고 채도 낮은 픽셀 = 배경 안개 → 투명,
+    #         나머지 중간 알파는 밝기에 비례해서 약간 투명하게 (FOG_ALPHA_LUT)
+    for y in range(0, h, tile_rows):
+        _remove_fog_tile(arr[y:y + tile_rows])
     
-    if medium_alpha.any():
-        # 해당 영역의 RGB 분석
-        medium_rgb = rgb[medium_alpha]
-        
-        # 밝기 계산 (0~255)
-        brightness = medium_rgb.mean(axis=1)
-        
-        # 채도 계산 (max-min)
-        saturation = medium_rgb.max(axis=1) - medium_rgb.min(axis=1)
-        
-        # 밝고 채도 낮은 = 배경 안개 (흰색/회색 계열)
-        is_bg_fog = (brightness > 180) & (saturation < 50)
-        
-        # 해당 픽셀 투명화
-        medium_indices = np.where(medium_alpha)
-        fog_mask = is_bg_fog
-        
-        arr[medium_indices[0][fog_mask], medium_indices[1][fog_mask], 3] = 0
-        
-        # 나머지 중간 알파: 밝기에 비례해서 약간 투명하게
-        remaining = ~fog_mask
-        remaining_brightness = brightness[remaining]
-        # 매우 밝은 반투명 → 더 투명하게
-        fade_factor = np.clip((remaining_brightness - 150) / 105, 0, 0.7)
-        current_alpha = arr[medium_indices[0][remaining], medium_indices[1][remaining], 3]
-        new_alpha = current_alpha * (1.0 - fade_factor)
-        arr[medium_indices[0][remaining], medium_indices[1][remaining], 3] = new_alpha
-    
-    # 방법 3: 가장자리 정리 — 이미지 테두리의 불투명 배경도 처리
-    # 이미지 경계에서 안쪽으로 flood-fill식 투명화
-    h, w = arr.shape[:2]
+    # 방법 3: 가장자리 정리 — 이미지 테두리의 밝고 채도 낮은 불투명 픽셀도 투명화
     border = 5
-    
-    # 테두리 영역에서 밝고 불투명한 픽셀도 투명화
     for region in [
         arr[0:border, :],        # 상단
         arr[h-border:h, :],      # 하단
@@ -117,22 +122,18 @@ def remove_semi_transparent_bg(img: Image.Image) -> Image.Image:
         arr[:, w-border:w],      # 우측
     ]:
         region_alpha = region[:, :, 3]
-        region_rgb = region[:, :, :3]
-        region_brightness = region_rgb.mean(axis=2)
-        region_saturation = region_rgb.max(axis=2) - region_rgb.min(axis=2)
+        region_total = region[:, :, :3].sum(axis=2, dtype=np.uint16)
+        region_saturation = region[:, :, :3].max(axis=2) - region[:, :, :3].min(axis=2)
         
-        # 밝고 채도 낮은 불투명 테두리 → 투명화
-        bg_mask = (region_brightness > 200) & (region_saturation < 40) & (region_alpha > 100)
-        region[bg_mask, 3] = 0
+        # 밝고(평균 > 200) 채도 낮은 불투명 테두리 → 투명화
+        bg_mask = (region_total > 600) & (region_saturation < 40) & (region_alpha > 100)
+        region_alpha[bg_mask] = 0
     
-    # 알파 값 정수로 클램핑
-    arr[:, :, 3] = np.clip(arr[:, :, 3], 0, 255)
-    
-    return Image.fromarray(arr.astype(np.uint8), "RGBA")
+    return Image.fromarray(arr, "RGBA")
 
 
-def process_image(filepath: Path) -> bool:
-    """단일 이미지 처리 (투명 배경 적용)"""
+def process_image(filepath: Path, snapshot=None) -> bool:
+    """단일 이미지 처리 (투명 배경 적용) — 저장 직전에 원본을 snapshot에 기록"""
     try:
         img = Image.open(filepath)
         if img.mode != "RGBA":
@@ -158,6 +159,8 @@ def process_image(filepath: Path) -> bool:
         improvement = (new_transparent - transparent_pixels) / total_pixels
         
         if improvement > 0.01:  # 1% 이상 개선 시에만 저장
+            if snapshot is not None:
+                snapshot.add(filepath)
             processed.save(filepath, "PNG", optimize=True)
             print(f"  ✅ 처리: {filepath.name} (투명 +{improvement:.1%})")
             return True
@@ -174,25 +177,14 @@ def main():
     """메인 실행"""
     print("🦉 해원의 문 — 이미지 배경 투명화 시작!")
     print(f"   에셋 경로: {ASSETS_DIR}")
-    print(f"   백업 경로: {BACKUP_DIR}")
     print()
     
     if not ASSETS_DIR.exists():
         print(f"❌ 에셋 디렉토리를 찾을 수 없어요: {ASSETS_DIR}")
         sys.exit(1)
     
-    # 백업 생성
-    if not BACKUP_DIR.exists():
-        print("📦 원본 백업 생성 중...")
-        for folder in TARGET_FOLDERS:
-            src = ASSETS_DIR / folder
-            dst = BACKUP_DIR / folder
-            if src.exists():
-                shutil.copytree(src, dst)
-                print(f"   ✅ {folder}/ 백업 완료")
-        print()
-    else:
-        print("📦 백업이 이미 존재합니다. 스킵.\n")
+    # 덮어쓸 파일만 스냅샷 (폴더 통째 백업 대신)
+    snapshot = SnapshotStore().begin("remove_bg", ASSETS_DIR)
     
     # 폴더별 처리
     total_processed = 0
@@ -208,7 +200,7 @@ def main():
         print(f"📁 {folder}/ ({len(png_files)}개 파일)")
         
         for filepath in sorted(png_files):
-            if process_image(filepath):
+            if process_image(filepath, snapshot):
                 total_processed += 1
             else:
                 total_skipped += 1
@@ -218,7 +210,9 @@ def main():
     # 결과 요약
     print("=" * 50)
     print(f"✅ 완료! 처리: {total_processed}개 | 스킵: {total_skipped}개")
-    print(f"📦 원본 백업: {BACKUP_DIR}")
+    name = snapshot.commit()
+    if name:
+        print(f"📸 원본 스냅샷: {name} (복원: python tools/snapshot_store.py restore {name})")
     print("🎮 'flutter run -d windows'로 결과를 확인하세요!")
 
 
@@ -2,33 +2,61 @@
 해원의 문 — AI 기반 이미지 배경 제거 스크립트 (rembg + U2Net)
 Pillow 기반보다 훨씬 정확한 딥러닝 배경 제거를 수행합니다.
 
-사용법: python scripts/remove_bg_ai.py
+사용법: python scripts/remove_bg_ai.py [--procs N] [--batch N]
+모델은 워커 프로세스마다 한 번만 로드 (tools/bg_worker.py), 전체 폴더의 파일을 워커에 분배.
 """
 
+import io
 import os
 import sys
+import argparse
 from pathlib import Path
 from PIL import Image
-from rembg import remove
 import numpy as np
-import shutil
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "tools"))
+from bg_worker import remove_background, run_pool, PROCS, BATCH
+from check_transparency import measure_transparency, MIN_TRANSPARENT_RATIO
+from snapshot_store import SnapshotStore
 
 # 설정
 ASSETS_DIR = Path(__file__).parent.parent / "assets" / "images"
-BACKUP_DIR = Path(__file__).parent.parent / "assets" / "images_backup"
 
 # 처리 대상 폴더 (fx 포함 — 마스터 요청)
 TARGET_FOLDERS = ["enemies", "heroes", "towers", "projectiles", "objects", "fx"]
 
+# triage: 테두리 불투명 픽셀이 이 비율 이하 + 투명 비율 충분 → rembg 생략
+TRIAGE_MAX_EDGE = 0.02
+
+
+def triage(img) -> str:
+    """rembg 전 빠른 판정: 알파 채널만 보고 작업이 필요한 이유 (필요 없으면 빈 문자열)
+    테두리가 거의 다 투명하고 투명 영역도 충분하면 이미 배경이 제거된 파일로 본다."""
+    if "A" not in img.getbands():
+        return "알파 없음"
+    ratio, edge = measure_transparency(np.asarray(img.getchannel("A")))
+    if ratio < MIN_TRANSPARENT_RATIO:
+        return f"투명 {ratio:.1%}"
+    if edge > TRIAGE_MAX_EDGE:
+        return f"테두리 불투명 {edge:.1%}"
+    return ""
 
-def process_image(filepath: Path) -> bool:
-    """rembg AI로 배경 제거"""
+
+def process_image(filepath: Path) -> str:
+    """rembg AI로 배경 제거 (triage 통과한 파일만)
+    저장했으면 덮어쓰기 전 원본의 스냅샷 객체 sha256, 아니면 빈 문자열"""
     try:
         with open(filepath, "rb") as f:
             input_data = f.read()
         
+        original_img = Image.open(io.BytesIO(input_data))
+        reason = triage(original_img)
+        if not reason:
+            print(f"  ⏭ {filepath.name} (이미 투명 — rembg 생략)")
+            return ""
+        
         # rembg AI 배경 제거 실행
-        output_data = remove(
+        output_data = remove_background(
             input_data,
             alpha_matting=True,           # 알파 매팅으로 가장자리 부드럽게
             alpha_matting_foreground_threshold=240,
@@ -37,33 +65,41 @@ def process_image(filepath: Path) -> bool:
         )
         
         # 결과 저장
-        output_img = Image.open(__import__("io").BytesIO(output_data))
+        output_img = Image.open(io.BytesIO(output_data))
         
-        # 비교: 개선이 있었는지 확인
-        original_img = Image.open(filepath).convert("RGBA")
-        orig_arr = np.array(original_img)
-        out_arr = np.array(output_img.convert("RGBA"))
+        # 비교: 개선이 있었는지 확인 (원본은 이미 연 이미지 재사용)
+        if "A" in original_img.getbands():
+            orig_alpha = np.asarray(original_img.getchannel("A"))
+        else:
+            orig_alpha = np.full(original_img.size[::-1], 255, dtype=np.uint8)
+        out_alpha = np.asarray(output_img.convert("RGBA").getchannel("A"))
         
-        total_pixels = orig_arr.shape[0] * orig_arr.shape[1]
-        orig_transparent = (orig_arr[:, :, 3] == 0).sum()
-        new_transparent = (out_arr[:, :, 3] == 0).sum()
+        total_pixels = orig_alpha.size
+        orig_transparent = (orig_alpha == 0).sum()
+        new_transparent = (out_alpha == 0).sum()
         
         improvement = (new_transparent - orig_transparent) / total_pixels
         
         if improvement > 0.005:  # 0.5% 이상 개선 시 저장
+            sha = SnapshotStore().put(filepath)
             output_img.save(filepath, "PNG", optimize=True)
-            print(f"  ✅ {filepath.name} (투명 +{improvement:.1%})")
-            return True
+            print(f"  ✅ {filepath.name} ({reason} → 투명 +{improvement:.1%})")
+            return sha
         else:
             print(f"  ⏭ {filepath.name} (이미 충분히 투명)")
-            return False
+            return ""
         
     except Exception as e:
         print(f"  ❌ {filepath.name} — {e}")
-        return False
+        return ""
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--procs", type=int, default=PROCS, help=f"워커 프로세스 수 (기본 {PROCS})")
+    parser.add_argument("--batch", type=int, default=BATCH, help=f"워커 작업당 파일 수 (기본 {BATCH})")
+    args = parser.parse_args()
+
     print("🦉 해원의 문 — AI 배경 제거 시작! (rembg + U2Net)")
     print(f"   에셋 경로: {ASSETS_DIR}")
     print()
@@ -72,22 +108,16 @@ def main():
         print(f"❌ 에셋 디렉토리 없음: {ASSETS_DIR}")
         sys.exit(1)
     
-    # 백업에서 원본 복원 (이전 Pillow 처리 결과를 되돌림)
-    if BACKUP_DIR.exists():
-        print("🔄 백업에서 원본 복원 중...")
-        for folder in TARGET_FOLDERS:
-            src = BACKUP_DIR / folder
-            dst = ASSETS_DIR / folder
-            if src.exists() and dst.exists():
-                for png in src.glob("*.png"):
-                    shutil.copy2(png, dst / png.name)
-                print(f"   ✅ {folder}/ 원본 복원")
-        print()
-    
-    # 폴더별 AI 처리
-    total_processed = 0
-    total_skipped = 0
+    # remove_bg 스냅샷에서 원본 복원 (이전 Pillow 처리 결과를 되돌림)
+    store = SnapshotStore()
+    originals = store.originals("remove_bg")
+    if originals:
+        print("🔄 remove_bg 스냅샷에서 원본 복원 중...")
+        restored = store.restore_files(originals, ASSETS_DIR, only=TARGET_FOLDERS)
+        print(f"   ✅ {restored}개 원본 복원\n")
     
+    # 전체 폴더의 파일을 모아 워커 프로세스에 분배
+    files = []
     for folder in TARGET_FOLDERS:
         folder_path = ASSETS_DIR / folder
         if not folder_path.exists():
@@ -96,18 +126,23 @@ def main():
         
         png_files = sorted(folder_path.glob("*.png"))
         print(f"📁 {folder}/ ({len(png_files)}개)")
-        
-        for filepath in png_files:
-            if process_image(filepath):
-                total_processed += 1
-            else:
-                total_skipped += 1
-        
-        print()
+        files.extend(png_files)
+    
+    print(f"\n🤖 {len(files)}개 — 워커 {args.procs}개, 작업당 {args.batch}개\n")
+    results = run_pool(process_image, files, procs=args.procs, batch=args.batch)
+    snapshot = store.begin("remove_bg_ai", ASSETS_DIR)
+    for filepath, sha in zip(files, results):
+        if sha:
+            snapshot.record(Path(os.path.relpath(filepath, ASSETS_DIR)).as_posix(), sha)
+    total_processed = len(snapshot.files)
+    total_skipped = len(results) - total_processed
     
+    print()
     print("=" * 50)
     print(f"✅ AI 처리 완료! 처리: {total_processed}개 | 스킵: {total_skipped}개")
-    print(f"📦 원본 백업: {BACKUP_DIR}")
+    name = snapshot.commit()
+    if name:
+        print(f"📸 원본 스냅샷: {name} (복원: python tools/snapshot_store.py restore {name})")
     print("🎮 'flutter run -d windows'로 결과를 확인하세요!")
 
 
@@ -0,0 +1,303 @@
+"""
+🦉 해원의 문 — 텍스처 아틀라스 패커 (MaxRects, 2의 거듭제곱 페이지)
+
+폴더의 낱장 PNG(fx 프레임, 적/타워 등)를 아틀라스 페이지 몇 장 + JSON 프레임 맵으로 묶는다.
+레벨 시작 때 작은 텍스처 수십 장 대신 페이지 몇 장만 디코딩/업로드하면 된다.
+
+  assets/images/atlas/fx.json      프레임 맵
+  assets/images/atlas/fx_0.png     페이지 (2의 거듭제곱 크기, 최대 --max-size)
+
+JSON (TexturePacker hash 형식과 같은 필드 이름):
+  {"meta": {"pages": [{"image": "fx_0.png", "size": {"w": 512, "h": 512}}], "padding": 2, "trim": 1, ...},
+   "frames": {"fx_hit_physical_0.png": {"page": 0, "frame": {"x":0,"y":0,"w":90,"h":84},
+                                        "rotated": false, "trimmed": true,
+                                        "spriteSourceSize": {"x":19,"y":22,"w":90,"h":84},
+                                        "sourceSize": {"w":128,"h":128}, "sha256": "..."}}}
+  Flame: images.load('atlas/fx_0.png') → Sprite(image, srcPosition: (x, y), srcSize: (w, h))
+         원래 앵커를 지키려면 sourceSize 크기 컴포넌트 안에서 spriteSourceSize.x/y 만큼 밀어 그린다
+  (pubspec.yaml에 assets/images/atlas/ 추가 필요)
+
+트리밍 (기본 켬, --trim-pad N / --no-trim):
+  프레임을 알파 바운딩 박스 + N px 여백으로 잘라 담는다 (1:1 생성 영웅/적/타워의 빈 여백,
+  128 캔버스 중앙에 놓인 fx 프레임의 투명 테두리를 텍스처에서 뺌). 잘린 위치와 원래 크기는
+  spriteSourceSize / sourceSize에 남는다. 내용이 그대로인 프레임은 지난 박스를 재사용 (디코딩 생략).
+
+증분 패킹:
+  내용만 바뀐 프레임 → 같은 자리에 다시 그림 (바뀐 페이지만 저장)
+  추가/크기 변경 프레임 → 기존 배치를 유지한 채 빈 공간에 삽입, 안 들어가면 전체 재패킹
+
+사용법:
+  python tools/atlas_packer.py                    → fx 폴더
+  python tools/atlas_packer.py fx enemies towers  → 폴더마다 아틀라스 하나
+  python tools/atlas_packer.py fx --force         → 전체 재패킹
+"""
+import io
+import os
+import json
+import argparse
+from pathlib import Path
+from PIL import Image
+from job_journal import save_atomic
+from snapshot_store import file_sha256
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets" / "images"
+ATLAS_DIR  = ASSETS_DIR / "atlas"
+MAX_SIZE   = 2048   # 페이지 최대 변 (모바일 GPU 안전 범위)
+PADDING    = 2      # 프레임 사이 여백 (필터링 번짐 방지)
+TRIM_PAD   = 1      # 트리밍 시 알파 박스 바깥으로 남길 투명 여백 (None = 트리밍 안 함)
+VERSION    = 2
+
+
+class MaxRects:
+    """MaxRects 빈 공간 관리 (Best Short Side Fit, 회전 없음)"""
+
+    def __init__(self, w, h):
+        self.w, self.h = w, h
+        self.free = [(0, 0, w, h)]
+
+    def find(self, w, h):
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                key = (min(fw - w, fh - h), max(fw - w, fh - h), fy, fx)
+                if best is None or key < best:
+                    best = key
+        return None if best is None else (best[3], best[2])
+
+    def place(self, x, y, w, h):
+        """(x, y, w, h)를 사용 중으로 표시 — 겹치는 빈 사각형을 최대 4조각으로 분할"""
+        split = []
+        for fx, fy, fw, fh in self.free:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                split.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                split.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                split.append((fx, y + h, fw, fy + fh - y - h))
+        # 다른 빈 사각형에 완전히 포함되는 것 제거
+        self.free = [a for i, a in enumerate(split)
+                     if not any(i != j and _contains(b, a) and (b != a or j < i)
+                                for j, b in enumerate(split))]
+
+    def insert(self, w, h):
+        pos = self.find(w, h)
+        if pos is not None:
+            self.place(pos[0], pos[1], w, h)
+        return pos
+
+
+def _contains(a, b):
+    return b[0] >= a[0] and b[1] >= a[1] and b[0] + b[2] <= a[0] + a[2] and b[1] + b[3] <= a[1] + a[3]
+
+
+def _pow2(n):
+    p = 1
+    while p < n:
+        p *= 2
+    return p
+
+
+def _pow2_range(max_size):
+    return [1 << i for i in range(4, max_size.bit_length()) if 1 << i <= max_size]
+
+
+def _fill(names, sizes, w, h, padding):
+    """names를 순서대로 w x h 페이지 하나에 채움 → ({이름: (x, y)}, 못 넣은 이름 목록)"""
+    # 오른쪽/아래 끝 프레임은 여백이 필요 없으므로 빈 공간을 padding만큼 넓게 잡는다
+    rects = MaxRects(w + padding, h + padding)
+    placed, rest = {}, []
+    for name in names:
+        pos = rects.insert(sizes[name][0] + padding, sizes[name][1] + padding)
+        if pos is None:
+            rest.append(name)
+        else:
+            placed[name] = pos
+    return placed, rest
+
+
+def trim_box(img, pad=TRIM_PAD):
+    """알파 바운딩 박스 + pad (이미지 범위로 자름) → (x, y, w, h). 완전히 투명하면 1x1"""
+    bbox = img.getchannel("A").getbbox() if "A" in img.getbands() else (0, 0, *img.size)
+    if bbox is None:
+        return 0, 0, 1, 1
+    x0, y0 = max(0, bbox[0] - pad), max(0, bbox[1] - pad)
+    x1, y1 = min(img.width, bbox[2] + pad), min(img.height, bbox[3] + pad)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def pack(sizes, max_size=MAX_SIZE, padding=PADDING):
+    """{이름: (w, h)} → ({이름: (page, x, y)}, [(page_w, page_h), ...])
+    페이지마다 남은 프레임이 다 들어가는 가장 작은 2의 거듭제곱 크기를 고르고,
+    max_size로도 안 되면 max_size 페이지를 큰 것부터 채운 뒤 다음 페이지로 넘긴다."""
+    for name, (w, h) in sizes.items():
+        if w > max_size or h > max_size:
+            raise ValueError(f"{name}: {w}x{h} 프레임이 페이지 최대 {max_size}보다 큼")
+    rest = sorted(sizes, key=lambda n: (-max(sizes[n]), -sizes[n][0] * sizes[n][1], n))
+    candidates = sorted(((w, h) for w in _pow2_range(max_size) for h in _pow2_range(max_size)
+                         if w // 2 <= h <= w * 2), key=lambda s: (s[0] * s[1], s[0]))
+    placements, pages = {}, []
+    while rest:
+        area = sum(sizes[n][0] * sizes[n][1] for n in rest)
+        for w, h in candidates:
+            if w * h < area or (w, h) == (max_size, max_size):
+                continue
+            placed, left = _fill(rest, sizes, w, h, padding)
+            if not left:
+                break
+        else:
+            w = h = max_size
+            placed, left = _fill(rest, sizes, w, h, padding)
+            used = [(x + sizes[n][0], y + sizes[n][1]) for n, (x, y) in placed.items()]
+            w, h = _pow2(max(u[0] for u in used)), _pow2(max(u[1] for u in used))
+        page = len(pages)
+        pages.append((w, h))
+        placements.update({n: (page, x, y) for n, (x, y) in placed.items()})
+        rest = left
+    return placements, pages
+
+
+def pack_incremental(old, sizes, padding=PADDING):
+    """기존 배치를 유지하고 새/크기 변경 프레임만 빈 공간에 삽입 → (placements, pages) 또는 None"""
+    pages = [(p["size"]["w"], p["size"]["h"]) for p in old["meta"]["pages"]]
+    bins = [MaxRects(w + padding, h + padding) for w, h in pages]
+    placements = {}
+    for name, f in old["frames"].items():
+        fr = f["frame"]
+        if name in sizes and sizes[name] == (fr["w"], fr["h"]):
+            bins[f["page"]].place(fr["x"], fr["y"], fr["w"] + padding, fr["h"] + padding)
+            placements[name] = (f["page"], fr["x"], fr["y"])
+    for name in sorted((n for n in sizes if n not in placements), key=lambda n: -max(sizes[n])):
+        w, h = sizes[name]
+        for page, rects in enumerate(bins):
+            pos = rects.insert(w + padding, h + padding)
+            if pos is not None:
+                placements[name] = (page, pos[0], pos[1])
+                break
+        else:
+            return None
+    return placements, pages
+
+
+def build_atlas(folder, base=ASSETS_DIR, out_dir=ATLAS_DIR, max_size=MAX_SIZE,
+                padding=PADDING, force=False, trim=TRIM_PAD):
+    """폴더 → 아틀라스 (trim: 트리밍 여백 px, None이면 원본 크기 그대로). (결과 요약 문자열) 반환"""
+    files = sorted(Path(base, folder).glob("*.png"))
+    if not files:
+        return f"⚠️ {folder}: PNG 없음"
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / f"{folder}.json"
+
+    old = None
+    if not force and manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            old = json.load(f)
+        meta = old.get("meta", {})
+        if meta.get("version") != VERSION or meta.get("padding") != padding or \
+                meta.get("maxSize") != max_size or meta.get("trim") != trim or \
+                not all((out_dir / p["image"]).exists() for p in meta.get("pages", [])):
+            old = None
+
+    # 프레임별 원본 크기 + 담을 영역 (내용이 그대로면 지난 트리밍 박스 재사용)
+    shas, sizes, sources, boxes = {}, {}, {}, {}
+    for fp in files:
+        shas[fp.name] = file_sha256(fp)
+        prev = old["frames"].get(fp.name) if old else None
+        if prev and prev["sha256"] == shas[fp.name]:
+            src, box = prev["sourceSize"], prev["spriteSourceSize"]
+            sources[fp.name] = (src["w"], src["h"])
+            boxes[fp.name] = (box["x"], box["y"], box["w"], box["h"])
+        else:
+            with Image.open(fp) as img:
+                sources[fp.name] = img.size
+                boxes[fp.name] = trim_box(img, trim) if trim is not None else (0, 0, *img.size)
+        sizes[fp.name] = boxes[fp.name][2:]
+
+    result = pack_incremental(old, sizes, padding) if old else None
+    if result is None:
+        placements, pages = pack(sizes, max_size, padding)
+        dirty = set(range(len(pages)))
+        redraw = set(sizes)
+        canvases = [Image.new("RGBA", size, (0, 0, 0, 0)) for size in pages]
+        mode = "전체 패킹"
+    else:
+        placements, pages = result
+        old_frames = old["frames"]
+        redraw = {n for n in sizes if n not in old_frames or old_frames[n]["sha256"] != shas[n]
+                  or (old_frames[n]["page"], old_frames[n]["frame"]["x"], old_frames[n]["frame"]["y"])
+                  != placements[n]}
+        gone = {n for n in old_frames if n not in sizes or n in redraw}
+        dirty = {placements[n][0] for n in redraw} | {old_frames[n]["page"] for n in gone}
+        canvases = [Image.open(out_dir / p["image"]).convert("RGBA") if i in dirty else None
+                    for i, p in enumerate(old["meta"]["pages"])]
+        # 지워졌거나 다시 그릴 프레임의 옛 자리를 비움
+        for n in gone:
+            f = old_frames[n]
+            fr = f["frame"]
+            canvases[f["page"]].paste((0, 0, 0, 0), (fr["x"], fr["y"], fr["x"] + fr["w"], fr["y"] + fr["h"]))
+        mode = "증분"
+
+    for name in sorted(redraw):
+        page, x, y = placements[name]
+        bx, by, bw, bh = boxes[name]
+        with Image.open(Path(base, folder, name)) as img:
+            canvases[page].paste(img.convert("RGBA").crop((bx, by, bx + bw, by + bh)), (x, y))
+
+    page_names = [f"{folder}_{i}.png" for i in range(len(pages))]
+    for i in sorted(dirty):
+        buf = io.BytesIO()
+        canvases[i].save(buf, "PNG", optimize=True)
+        save_atomic(out_dir / page_names[i], data=buf.getvalue())
+    for stale in out_dir.glob(f"{folder}_*.png"):
+        if stale.name not in page_names and stale.stem[len(folder) + 1:].isdigit():
+            stale.unlink()
+
+    manifest = {
+        "meta": {"app": "haewon atlas_packer", "version": VERSION, "padding": padding,
+                 "maxSize": max_size, "trim": trim,
+                 "pages": [{"image": n, "size": {"w": w, "h": h}} for n, (w, h) in zip(page_names, pages)]},
+        "frames": {n: {"page": placements[n][0],
+                       "frame": {"x": placements[n][1], "y": placements[n][2],
+                                 "w": sizes[n][0], "h": sizes[n][1]},
+                       "rotated": False,
+                       "trimmed": boxes[n] != (0, 0, *sources[n]),
+                       "spriteSourceSize": dict(zip("xywh", boxes[n])),
+                       "sourceSize": {"w": sources[n][0], "h": sources[n][1]},
+                       "sha256": shas[n]} for n in sorted(sizes)},
+    }
+    save_atomic(manifest_path, data=json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    area = sum(w * h for w, h in sizes.values())
+    source_area = sum(w * h for w, h in sources.values())
+    page_area = sum(w * h for w, h in pages)
+    return (f"✅ {folder}: {mode} — 프레임 {len(sizes)}개 → 페이지 {len(pages)}장 "
+            f"({', '.join(f'{w}x{h}' for w, h in pages)}), 채움 {area / page_area:.0%}, "
+            f"트리밍 후 픽셀 {area / source_area:.0%}, "
+            f"다시 그림 {len(redraw)}개 / 저장 페이지 {len(dirty)}장")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folders", nargs="*", default=["fx"])
+    parser.add_argument("--base", type=str, default=str(ASSETS_DIR))
+    parser.add_argument("--out", type=str, default=None, help="출력 폴더 (기본 <base>/atlas)")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE)
+    parser.add_argument("--padding", type=int, default=PADDING)
+    parser.add_argument("--force", action="store_true", help="기존 배치 무시하고 전체 재패킹")
+    parser.add_argument("--trim-pad", type=int, default=TRIM_PAD, help=f"트리밍 여백 px (기본 {TRIM_PAD})")
+    parser.add_argument("--no-trim", action="store_true", help="트리밍 없이 원본 크기로 담기")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(args.base, "atlas")
+    trim = None if args.no_trim else args.trim_pad
+    for folder in args.folders:
+        print(build_atlas(folder, args.base, out, args.max_size, args.padding, args.force, trim))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+🦉 해원의 문 — 에셋 생성 처리량 벤치마크 (오프라인)
+
+fake_imagen_server를 띄우고 bulk_imagen_v2의 작업 목록을 실제 파이프라인
+(토큰 버킷 → fetch → 투명화 → 저장)으로 돌린다. 출력/캐시/저널은 임시 폴더.
+
+보고: 에셋/분, 작업 지연 p50/p95, 재시도 오버헤드, 서버 응답 분포
+
+사용법:
+  python tools/bench_imagen.py                          → 전체 작업, 기본 설정
+  python tools/bench_imagen.py --only heroes --rpm 60 --workers 8
+  python tools/bench_imagen.py --latency 4 --rate-429 0.1 --wait-sec 1
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+
+import bulk_imagen_v2 as gen
+import gen_cache
+import vertex_client
+from job_journal import JobJournal
+from fake_imagen_server import FakeImagen, start_server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", type=str, default=None, help="카테고리 하나만")
+    parser.add_argument("--limit", type=int, default=0, help="작업 수 상한 (0 = 전체)")
+    parser.add_argument("--workers", type=int, default=gen.WORKERS)
+    parser.add_argument("--rpm", type=int, default=gen.RATE_RPM)
+    parser.add_argument("--procs", type=int, default=gen.PROCS)
+    parser.add_argument("--samples", type=int, default=1)
+    parser.add_argument("--wait-sec", type=float, default=1.0,
+                        help="429 백오프 기준 초 (실제 설정 WAIT_SEC 대신)")
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--jitter", type=float, default=0.5)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--burst-429", type=int, default=3)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    args = parser.parse_args()
+
+    builders = {
+        "bg": gen.build_bg_jobs, "heroes": gen.build_hero_jobs, "effects": gen.build_effect_jobs,
+        "enemies": gen.build_enemy_jobs, "towers": gen.build_tower_jobs, "misc": gen.build_misc_jobs,
+    }
+    jobs = []
+    for cat, build in builders.items():
+        if args.only in (None, cat):
+            jobs.extend(build())
+    if args.limit:
+        jobs = jobs[:args.limit]
+
+    fake = FakeImagen(args.latency, args.jitter, args.rate_429, args.burst_429, args.rate_5xx)
+    server, url = start_server(fake)
+    vertex_client.ENDPOINT = url
+
+    tmp = tempfile.mkdtemp(prefix="imagen_bench_")
+    gen.BASE_DIR = os.path.join(tmp, "images")
+    gen.ARCHIVE_DIR = os.path.join(tmp, "candidates")
+    gen.WAIT_SEC = args.wait_sec
+    gen.BREAKER = gen.CircuitBreaker(window=20, threshold=0.5, cooldown=args.wait_sec * 2)
+    gen_cache.CACHE_DIR = os.path.join(tmp, "cache")
+    journal = JobJournal(os.path.join(tmp, "journal.sqlite"))
+
+    print("=" * 60)
+    print(f"  🧪 생성 벤치마크 — 작업 {len(jobs)}개 | 동시 {args.workers} | 분당 {args.rpm}회 | "
+          f"투명화 {args.procs}프로세스")
+    print(f"  대역 서버: 지연 {args.latency}±{args.jitter}초 | 429 {args.rate_429:.0%} | "
+          f"5xx {args.rate_5xx:.0%}")
+    print("=" * 60)
+
+    run_args = argparse.Namespace(workers=args.workers, procs=args.procs,
+                                  samples=args.samples, fresh=True)
+    pending = list(enumerate(jobs, 1))
+    bucket = gen.TokenBucket(args.rpm, burst=min(args.workers, args.rpm))
+    started = time.monotonic()
+    results = asyncio.run(gen.run_pipeline(pending, len(jobs), bucket, journal, run_args))
+    elapsed = time.monotonic() - started
+    server.shutdown()
+
+    done = journal.records("done")
+    latencies = np.array([r[5] for r in done]) if done else np.zeros(1)
+    requests = sum(r[4] for r in journal.records())
+    finished = results["ok"] + results["fail"]
+
+    print(f"\n{'='*60}")
+    print(f"📊 결과 ({elapsed:.1f}초)")
+    print(f"  성공 {results['ok']} | 실패 {results['fail']}")
+    print(f"  처리량: {results['ok'] / elapsed * 60:.1f} 에셋/분 "
+          f"(요청 분당 {bucket.achieved_rpm():.1f}회 / 한도 {args.rpm}회)")
+    print(f"  작업 지연: p50 {np.percentile(latencies, 50):.2f}초 | "
+          f"p95 {np.percentile(latencies, 95):.2f}초")
+    if finished:
+        print(f"  재시도 오버헤드: 요청 {requests}회 / 작업 {finished}개 "
+              f"= +{(requests - finished) / finished:.0%}")
+    print(f"  서버 응답: {fake.counts} | 서킷 브레이커 차단 {gen.BREAKER.trips}회")
+    print(f"  임시 출력: {tmp}")
+
+
+if __name__ == "__main__":
+    main()
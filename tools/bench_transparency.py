@@ -0,0 +1,176 @@
+"""
+🦉 해원의 문 — 투명화 함수 정합성(골든) + 속도 벤치마크
+
+현재 구현과 이전 구현(비교 기준으로 이 파일에 보관)의 출력이 픽셀 단위로
+같은지 확인하고 처리 시간을 비교한다. 입력을 주지 않으면 합성 이미지 사용.
+  fx  : bulk_imagen_v2.make_transparent_fx      (LUT ↔ int64/float 마스크)
+  fog : scripts/remove_bg.remove_semi_transparent_bg (uint8 타일 ↔ float32 팬시 인덱싱)
+        타일 경계가 결과에 영향이 없는지 여러 tile_rows로도 비교
+
+사용법:
+  python tools/bench_transparency.py                      → fx + fog, 합성 이미지
+  python tools/bench_transparency.py --target fx assets/images/effects/*.png --repeat 20
+  python tools/bench_transparency.py --target fog assets/images/bg/*.png
+"""
+import os
+import sys
+import time
+import argparse
+from functools import partial
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+from bulk_imagen_v2 import make_transparent_fx
+from remove_bg import remove_semi_transparent_bg
+
+
+def make_transparent_fx_reference(img):
+    """이전 구현 (비교 기준)"""
+    img = img.convert("RGBA")
+    d = np.array(img)
+    r, g, b = d[:,:,0].astype(int), d[:,:,1].astype(int), d[:,:,2].astype(int)
+    brightness = (r + g + b) / 3
+    dark = brightness < 40
+    d[:,:,3][dark] = 0
+    semi = (brightness >= 40) & (brightness < 80)
+    alpha_ratio = (brightness[semi] - 40) / 40
+    d[:,:,3][semi] = (alpha_ratio * 255).astype(np.uint8)
+    return Image.fromarray(d)
+
+
+def remove_semi_transparent_bg_reference(img):
+    """이전 remove_semi_transparent_bg 구현 (비교 기준, float32 + 팬시 인덱싱)"""
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    
+    arr = np.array(img, dtype=np.float32)
+    alpha = arr[:, :, 3]
+    rgb = arr[:, :, :3]
+    
+    # 방법 1: 매우 낮은 알파(거의 투명) → 완전 투명으로
+    very_low_alpha = alpha < 30
+    arr[very_low_alpha, 3] = 0
+    
+    # 방법 2: 중간 알파(반투명 영역) 분석
+    # 빈 공간(내용이 없는 영역)의 반투명 픽셀을 투명으로
+    # 핵심: 밝고 채도 낮은 반투명 픽셀 = 배경 안개
+    medium_alpha = (alpha >= 30) & (alpha < 200)
+    
+    if medium_alpha.any():
+        # 해당 영역의 RGB 분석
+        medium_rgb = rgb[medium_alpha]
+        
+        # 밝기 계산 (0~255)
+        brightness = medium_rgb.mean(axis=1)
+        
+        # 채도 계산 (max-min)
+        saturation = medium_rgb.max(axis=1) - medium_rgb.min(axis=1)
+        
+        # 밝고 채도 낮은 = 배경 안개 (흰색/회색 계열)
+        is_bg_fog = (brightness > 180) & (saturation < 50)
+        
+        # 해당 픽셀 투명화
+        medium_indices = np.where(medium_alpha)
+        fog_mask = is_bg_fog
+        
+        arr[medium_indices[0][fog_mask], medium_indices[1][fog_mask], 3] = 0
+        
+        # 나머지 중간 알파: 밝기에 비례해서 약간 투명하게
+        remaining = ~fog_mask
+        remaining_brightness = brightness[remaining]
+        # 매우 밝은 반투명 → 더 투명하게
+        fade_factor = np.clip((remaining_brightness - 150) / 105, 0, 0.7)
+        current_alpha = arr[medium_indices[0][remaining], medium_indices[1][remaining], 3]
+        new_alpha = current_alpha * (1.0 - fade_factor)
+        arr[medium_indices[0][remaining], medium_indices[1][remaining], 3] = new_alpha
+    
+    # 방법 3: 가장자리 정리 — 이미지 테두리의 불투명 배경도 처리
+    # 이미지 경계에서 안쪽으로 flood-fill식 투명화
+    h, w = arr.shape[:2]
+    border = 5
+    
+    # 테두리 영역에서 밝고 불투명한 픽셀도 투명화
+    for region in [
+        arr[0:border, :],        # 상단
+        arr[h-border:h, :],      # 하단
+        arr[:, 0:border],        # 좌측
+        arr[:, w-border:w],      # 우측
+    ]:
+        region_alpha = region[:, :, 3]
+        region_rgb = region[:, :, :3]
+        region_brightness = region_rgb.mean(axis=2)
+        region_saturation = region_rgb.max(axis=2) - region_rgb.min(axis=2)
+        
+        # 밝고 채도 낮은 불투명 테두리 → 투명화
+        bg_mask = (region_brightness > 200) & (region_saturation < 40) & (region_alpha > 100)
+        region[bg_mask, 3] = 0
+    
+    # 알파 값 정수로 클램핑
+    arr[:, :, 3] = np.clip(arr[:, :, 3], 0, 255)
+    
+    return Image.fromarray(arr.astype(np.uint8), "RGBA")
+
+
+def synthetic_inputs():
+    rng = np.random.default_rng(0)
+    # 모든 밝기합이 나오는 균등 잡음 (RGB) + 임의 알파 (RGBA)
+    rgb = rng.integers(0, 256, size=(1024, 1024, 3), dtype=np.uint8)
+    rgba = rng.integers(0, 256, size=(1024, 1024, 4), dtype=np.uint8)
+    # 밝은 회색 반투명 안개 + 작은 채도 (fog 분기 집중) — 타일 크기로 나누어지지 않는 높이
+    fog = rng.integers(0, 256, size=(1000, 777, 4), dtype=np.uint8)
+    grey = rng.integers(150, 256, size=(1000, 777, 1), dtype=np.int16)
+    fog[..., :3] = np.clip(grey + rng.integers(-30, 31, size=(1000, 777, 3)), 0, 255)
+    return [("noise_rgb_1024", Image.fromarray(rgb, "RGB")),
+            ("noise_rgba_1024", Image.fromarray(rgba, "RGBA")),
+            ("fog_rgba_777x1000", Image.fromarray(fog, "RGBA"))]
+
+# 대상 → (현재 구현 목록, 비교 기준)
+TARGETS = {
+    "fx": ([make_transparent_fx], make_transparent_fx_reference),
+    "fog": ([remove_semi_transparent_bg, partial(remove_semi_transparent_bg, tile_rows=7),
+             partial(remove_semi_transparent_bg, tile_rows=100000)],
+            remove_semi_transparent_bg_reference),
+}
+
+
+def best_time(fn, img, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(img)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--target", choices=list(TARGETS), default=None, help="기본: 전부")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    inputs = [(f, Image.open(f)) for f in args.files] or synthetic_inputs()
+    ok = True
+    for target in [args.target] if args.target else list(TARGETS):
+        impls, reference = TARGETS[target]
+        print(f"━━ {target} ━━")
+        total_ref = total_new = 0.0
+        for name, img in inputs:
+            img.load()
+            expected = np.asarray(reference(img))
+            same = all(np.array_equal(np.asarray(fn(img)), expected) for fn in impls)
+            t_ref = best_time(reference, img, args.repeat)
+            t_new = best_time(impls[0], img, args.repeat)
+            total_ref += t_ref
+            total_new += t_new
+            ok &= same
+            print(f"{'✅' if same else '❌'} {name}: {img.size[0]}x{img.size[1]} | "
+                  f"이전 {t_ref * 1000:.1f}ms → 현재 {t_new * 1000:.1f}ms (x{t_ref / t_new:.1f})")
+        print(f"  전체 x{total_ref / total_new:.1f}\n")
+    print(f"{'🎉 픽셀 동일' if ok else '🚨 출력 불일치'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
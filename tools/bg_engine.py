@@ -0,0 +1,203 @@
+"""
+🦉 해원의 문 — 배경 제거 엔진 (전략 자동 선택)
+
+흩어져 있던 배경 제거 방식을 전략 하나씩으로 묶고, 이미지마다
+테두리 통계로 후보를 골라 싼 것부터 시도한다. 결과가 품질 기준
+(check_transparency.diagnose 통과 + 과삭제 아님)을 만족하면 거기서 멈추고,
+끝까지 안 되면 AI(rembg isnet-anime)로 넘어간다.
+
+  전략        비용  출처
+  keep         0   이미 투명 (작업 없음)
+  flood_dark   1   bulk_imagen_v2.make_transparent — 테두리 연결 검정 배경
+  flood_chroma 1   bulk_imagen_v2.make_transparent(key="chroma") — 초록 배경
+  fx           1   bulk_imagen_v2.make_transparent_fx — 전역 밝기 기준 (발광 이펙트)
+  white        1   check_transparency.remove_white_bg — 흰/밝은 회색 배경
+  fog          2   scripts/remove_bg.remove_semi_transparent_bg — 반투명 안개
+  u2net       50   scripts/remove_bg_ai 설정 (u2net + 알파 매팅) — 규칙 기반이 모두 안 되면 ai 전에 시도
+  ai         100   reprocess_bg.make_transparent (isnet-anime + 알파 매팅)
+
+사용법:
+  python tools/bg_engine.py                      → 전체 대상 폴더 (미리보기만)
+  python tools/bg_engine.py heroes fx --apply    → 선택 결과 저장
+  python tools/bg_engine.py --strategy fog --apply enemies   → 전략 강제
+
+--apply는 합격한 결과만 저장하고, 덮어쓰기 전 원본을 스냅샷 저장소에 기록한다
+(python tools/snapshot_store.py restore <이름>으로 복원).
+"""
+import sys
+import argparse
+from pathlib import Path
+from PIL import Image
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+from bulk_imagen_v2 import make_transparent, make_transparent_fx
+from check_transparency import (measure_transparency, diagnose, remove_white_bg,
+                                BASE_DIR, TARGET_FOLDERS)
+from remove_bg import remove_semi_transparent_bg
+from bg_worker import remove_background, run_pool, PROCS, BATCH
+import reprocess_bg
+from job_journal import save_atomic
+from snapshot_store import SnapshotStore
+
+# ━━ 판정 기준 ━━
+RING               = 4      # 테두리 통계에 쓰는 바깥 띠 두께 (px)
+CLEAN_MAX_EDGE     = 0.02   # 테두리 불투명 비율이 이 이하면 이미 투명
+BORDER_SHARE       = 0.6    # 테두리의 이 비율 이상이 한 배경색이면 그 전략 후보
+FOG_SHARE          = 0.3    # 테두리 반투명 비율이 이 이상이면 fog 후보
+MAX_TRANSPARENT    = 0.97   # 결과가 이보다 투명하면 본체까지 지운 것으로 보고 탈락
+EFFECT_FOLDERS     = {"fx", "effects"}
+AI_MODEL           = reprocess_bg.MODEL
+
+
+def _rgba(img):
+    return np.array(img.convert("RGBA"))
+
+def run_flood_dark(img):
+    return make_transparent(img, "dark")
+
+def run_flood_chroma(img):
+    return make_transparent(img, "chroma")
+
+def run_white(img):
+    return Image.fromarray(remove_white_bg(_rgba(img)), "RGBA")
+
+def run_u2net(img):
+    return remove_background(img.convert("RGBA"), "u2net", alpha_matting=True,
+                             alpha_matting_foreground_threshold=240,
+                             alpha_matting_background_threshold=10,
+                             alpha_matting_erode_size=10)
+
+# 이름 → (비용, 함수)
+STRATEGIES = {
+    "keep":         (0, lambda img: img),
+    "flood_dark":   (1, run_flood_dark),
+    "flood_chroma": (1, run_flood_chroma),
+    "fx":           (1, make_transparent_fx),
+    "white":        (1, run_white),
+    "fog":          (2, remove_semi_transparent_bg),
+    "u2net":        (50, run_u2net),
+    "ai":           (100, reprocess_bg.make_transparent),
+}
+
+
+def border_stats(d):
+    """RGBA 배열 바깥 RING px 띠의 비율 통계 (dict)"""
+    ring = np.concatenate([d[:RING].reshape(-1, 4), d[-RING:].reshape(-1, 4),
+                           d[RING:-RING, :RING].reshape(-1, 4), d[RING:-RING, -RING:].reshape(-1, 4)])
+    rgb = ring[:, :3].astype(np.int16)
+    a = ring[:, 3]
+    opaque = a > 50
+    bright = rgb.sum(axis=1)
+    sat = rgb.max(axis=1) - rgb.min(axis=1)
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    n = max(1, int(opaque.sum()))
+    return {
+        "opaque": opaque.mean(),
+        "semi": ((a > 0) & (a < 250)).mean(),
+        "dark": (opaque & (bright < 240)).sum() / n,
+        "white": (opaque & (bright > 540) & (sat < 50)).sum() / n,
+        "chroma": (opaque & (g >= 100) & (g - r >= 40) & (g - b >= 40)).sum() / n,
+    }
+
+
+def plan(d, category=""):
+    """테두리 통계 → 시도할 전략 이름 목록 (비용 순, 끝은 항상 u2net → ai)"""
+    ratio, edge = measure_transparency(d[..., 3])
+    if edge <= CLEAN_MAX_EDGE and not diagnose(ratio, edge):
+        return ["keep"]
+    st = border_stats(d)
+    names = []
+    if st["dark"] >= BORDER_SHARE:
+        names += ["fx", "flood_dark"] if category in EFFECT_FOLDERS else ["flood_dark", "fx"]
+    if st["chroma"] >= BORDER_SHARE:
+        names.append("flood_chroma")
+    if st["white"] >= BORDER_SHARE:
+        names.append("white")
+    if st["semi"] >= FOG_SHARE:
+        names.append("fog")
+    names += ["u2net", "ai"]
+    return sorted(names, key=lambda n: STRATEGIES[n][0])
+
+
+def judge(img):
+    """품질 기준 → 불합격 사유 (합격이면 빈 문자열)"""
+    ratio, edge = measure_transparency(np.asarray(img.convert("RGBA"))[..., 3])
+    if ratio > MAX_TRANSPARENT:
+        return f"과삭제 ({ratio:.0%} 투명)"
+    return diagnose(ratio, edge)
+
+
+def remove_bg_auto(img, category="", strategy=None):
+    """가장 싼 합격 전략으로 배경 제거 → (결과 이미지, 전략 이름, 사유)
+    strategy를 주면 그 전략만 적용. 아무 전략도 합격 못 하면 원본 이미지와
+    마지막으로 시도한 전략 이름 + 불합격 사유를 반환 (사유가 비어 있지 않으면 실패)."""
+    img = img.convert("RGBA")
+    names = [strategy] if strategy else plan(np.asarray(img), category)
+    reason = ""
+    for name in names:
+        out = STRATEGIES[name][1](img)
+        reason = judge(out)
+        if not reason:
+            return out, name, ""
+    return img, name, reason
+
+
+def process_file(job):
+    """워커에서 실행: (경로, 강제 전략, 저장 여부) → (상대 경로, 전략, 사유, 스냅샷 sha256)
+    합격한 결과만 저장하고, 저장했으면 덮어쓰기 전 원본의 스냅샷 객체 sha256을 돌려준다."""
+    fp, strategy, apply = job
+    category = fp.parent.name
+    try:
+        img = Image.open(fp)
+        img.load()
+        out, name, reason = remove_bg_auto(img, category, strategy)
+        sha = ""
+        if apply and name != "keep" and not reason:
+            sha = SnapshotStore().put(fp)
+            save_atomic(str(fp), img=out)
+        return f"{category}/{fp.name}", name, reason, sha
+    except Exception as e:
+        return f"{category}/{fp.name}", "error", str(e), ""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folders", nargs="*", default=TARGET_FOLDERS)
+    parser.add_argument("--apply", action="store_true", help="결과 저장 (기본: 선택 결과만 출력)")
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default=None, help="전략 강제")
+    parser.add_argument("--base", type=str, default=str(BASE_DIR))
+    parser.add_argument("--procs", type=int, default=PROCS, help=f"워커 프로세스 수 (기본 {PROCS})")
+    parser.add_argument("--batch", type=int, default=BATCH)
+    args = parser.parse_args()
+
+    files = []
+    for folder in args.folders:
+        path = Path(args.base) / folder
+        if path.exists():
+            files.extend(sorted(path.glob("*.png")))
+    print(f"🦉 배경 제거 엔진 — {len(files)}개 | 워커 {args.procs}개 | "
+          f"{'저장' if args.apply else '미리보기'}")
+
+    jobs = [(fp, args.strategy, args.apply) for fp in files]
+    # AI는 필요한 워커에서만 로드 (preload=False)
+    results = run_pool(process_file, jobs, model=AI_MODEL, procs=args.procs,
+                       batch=args.batch, preload=False)
+
+    snapshot = SnapshotStore().begin("bg_engine", args.base)
+    counts = {}
+    for name, strategy, reason, sha in results:
+        if sha:
+            snapshot.record(name, sha)
+        counts[strategy] = counts.get(strategy, 0) + 1
+        if strategy != "keep":
+            mark = "❌" if strategy == "error" else "⚠️" if reason else "✅"
+            print(f"  {mark} {name}: {strategy}" + (f" — {reason} (원본 유지)" if reason else ""))
+    print(f"\n📊 전략별: " + " | ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+    snap = snapshot.commit()
+    if snap:
+        print(f"📸 원본 스냅샷: {snap} (복원: python tools/snapshot_store.py restore {snap})")
+
+
+if __name__ == "__main__":
+    main()
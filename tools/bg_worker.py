@@ -0,0 +1,75 @@
+"""
+🦉 해원의 문 — rembg 배경 제거 워커 풀
+
+rembg.remove()를 session 없이 부르면 호출마다 ONNX 모델을 새로 로드한다.
+여기서는 모델을 프로세스당 한 번만 로드하고 계속 재사용한다.
+  - remove_background(): 프로세스 안에서 모델별로 캐시한 세션으로 remove() 호출
+                         (rembg는 처음 쓸 때 import → --help 등에서는 로드 안 함)
+  - run_pool(): 파일을 BATCH개씩 묶어 코어 수만큼의 워커 프로세스에 분배
+                (워커는 시작할 때 모델을 미리 로드, ONNX 스레드는 코어를 나눠 씀)
+
+사용법:
+  from bg_worker import remove_background, run_pool
+  out = remove_background(img, "isnet-anime", alpha_matting=True)
+  results = run_pool(process_image, files, model="u2net")   # fn은 모듈 최상위 함수
+"""
+import os
+import math
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+DEFAULT_MODEL = "u2net"
+BATCH = 8                                      # 워커 작업 1건당 파일 수
+PROCS = max(1, (os.cpu_count() or 2) - 1)      # 워커 프로세스 수
+
+_sessions = {}
+_model = DEFAULT_MODEL   # 이 프로세스의 기본 모델 (워커는 initializer에서 지정)
+
+
+def get_session(model=None):
+    """모델별 rembg 세션 (프로세스당 한 번 로드)"""
+    model = model or _model
+    if model not in _sessions:
+        from rembg import new_session
+        _sessions[model] = new_session(model)
+    return _sessions[model]
+
+
+def remove_background(data, model=None, **options):
+    """캐시된 세션으로 rembg.remove() — data는 bytes / PIL 이미지 / ndarray"""
+    from rembg import remove
+    return remove(data, session=get_session(model), **options)
+
+
+def _init_worker(model, threads, preload=True):
+    """워커 시작: ONNX 스레드 수를 코어/워커로 나누고 모델 미리 로드"""
+    global _model
+    os.environ["OMP_NUM_THREADS"] = str(threads)  # rembg가 세션 옵션에 반영
+    _model = model
+    if preload:
+        get_session(model)
+
+
+def _run_batch(fn, batch):
+    return [fn(item) for item in batch]
+
+
+def batched(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_pool(fn, items, model=DEFAULT_MODEL, procs=PROCS, batch=BATCH, preload=True):
+    """items를 batch개씩 묶어 procs개 워커 프로세스에서 fn(item) 실행 → 결과 목록 (입력 순서)
+    fn은 모듈 최상위 함수여야 한다 (Windows spawn에서 pickle 가능해야 함)
+    preload=False면 모델은 실제로 처음 쓰일 때 로드 (AI를 가끔만 쓰는 경우)"""
+    items = list(items)
+    if not items:
+        return []
+    procs = max(1, min(procs, math.ceil(len(items) / batch)))
+    threads = max(1, (os.cpu_count() or 1) // procs)
+    if procs == 1:
+        _init_worker(model, threads, preload)
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(procs, initializer=_init_worker, initargs=(model, threads, preload)) as pool:
+        chunks = pool.map(partial(_run_batch, fn), batched(items, batch))
+        return [r for chunk in chunks for r in chunk]
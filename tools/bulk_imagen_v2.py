@@ -2,23 +2,34 @@
 🦉 해원의 문 — 에셋 생성 파이프라인 v7 (최종)
 
 원칙:
-  ① AI: 크로마키 초록(#00FF00) 배경 위에 그림
-  ② Python: 초록 배경만 flood fill 투명화 (리사이즈 없음)
+  ① AI: 단색 배경(검정, 작업 "key"가 chroma면 초록 #00FF00) 위에 그림
+  ② Python: 테두리와 연결된 배경만 flood fill 투명화 (리사이즈 없음)
   ③ Flutter: 단일 이미지 + 코드 애니메이션
 
 사용법:
   python tools/bulk_imagen_v2.py              → 누락된 에셋만 생성
   python tools/bulk_imagen_v2.py --only bg    → bg 폴더만 생성
   python tools/bulk_imagen_v2.py --only heroes → heroes 폴더만 생성
+  python tools/bulk_imagen_v2.py --workers 6 --rpm 30 → 동시 6개, 분당 30회 한도
+  python tools/bulk_imagen_v2.py --procs 4    → 투명화 프로세스 4개
+  python tools/bulk_imagen_v2.py --redo       → 기존 파일도 캐시 원본으로 다시 투명화
+  python tools/bulk_imagen_v2.py --fresh      → 캐시 무시하고 API로 새로 생성
+  python tools/bulk_imagen_v2.py --samples 4  → 요청당 4장 받아 투명화 지표 최선 1장 저장
+  python tools/bulk_imagen_v2.py --stats      → 작업 저널의 카테고리별 처리량 통계
+
+생성 원본은 .imagen_cache/에 보관 → 투명화 튜닝 시 API 호출 없이 재처리
 """
-import os, sys, base64, time, argparse
-import requests as http_requests
+import os, sys, time, argparse, threading, asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from io import BytesIO
 from PIL import Image
 import numpy as np
-from collections import deque
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from scipy import ndimage
+from vertex_client import (get_client, read_predictions, backoff_delay, retry_after_sec,
+                           CircuitBreaker, RETRYABLE)
+import gen_cache
+from job_journal import JobJournal, save_atomic, category_of
+from check_transparency import measure_transparency, diagnose
 
 # ━━ 설정 ━━
 KEY_PATH   = r"e:\defense\autotrade-engine-key.json"
@@ -26,72 +37,225 @@ PROJECT_ID = "autotrade-engine"
 LOCATION   = "us-central1"
 MODEL_ID   = "imagen-3.0-generate-001"
 BASE_DIR   = r"e:\defense\assets\images"
+ARCHIVE_DIR = r"e:\defense\assets\images_candidates"  # 멀티 샘플 탈락 후보
 WAIT_SEC   = 15
 MAX_RETRY  = 3
+WORKERS    = 4    # 동시 요청 수
+RATE_RPM   = 20   # 분당 요청 한도 (Vertex Imagen 쿼터)
+SAMPLES    = 1    # 투명화 에셋 요청당 후보 수 (Imagen 최대 4)
+PROCS      = max(1, (os.cpu_count() or 2) - 1)  # 투명화 프로세스 수
+QUEUE_SIZE = 8    # 단계 사이 대기열 한도 (메모리 상한)
+
+# 모든 요청이 공유하는 서킷 브레이커: 최근 오류율 50% 이상이면 전체 일시정지
+BREAKER = CircuitBreaker(window=20, threshold=0.5, cooldown=WAIT_SEC * 2)
 
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-# 투명화 v11: 검정 배경 제거 (통일)
-#   모든 캐릭터/타워/적: 프롬프트에서 검은색 금지 → FX 투명화로 충분
-#   이펙트: 발광체 → FX 투명화
+# 투명화 v12: 외곽 연결 배경만 제거
+#   캐릭터/타워/적/UI: 테두리에 닿은 배경색 영역만 투명 → 본체 안의 검정(머리카락, 외곽선)은 유지
+#   이펙트: 발광체 → FX 투명화 (전역 밝기 기준)
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-def make_transparent(img):
-    """투명화 v11: FX 방식 통일 (= make_transparent_fx)
-    프롬프트에서 검은색 사용을 금지하여 본체 내부에 어두운 픽셀이 없음 →
-    FX 투명화가 배경만 정확히 제거."""
-    return make_transparent_fx(img)
+CHROMA_MIN_G   = 100   # 크로마키: G가 이 값 이상이고
+CHROMA_MARGIN  = 40    #          R, B보다 이만큼 이상 클 때 배경 후보
+BG_CONNECTIVITY = np.ones((3, 3), dtype=bool)  # 8방향 연결
+
+def background_mask(d, key="dark"):
+    """배경색 후보 픽셀 마스크 (테두리 연결 여부와 무관)
+    dark: 밝기 < 80 (FX 램프 구간까지) / chroma: 초록(#00FF00) 계열"""
+    if key == "chroma":
+        r, g, b = (d[:,:,i].astype(np.int16) for i in range(3))
+        return (g >= CHROMA_MIN_G) & (g - r >= CHROMA_MARGIN) & (g - b >= CHROMA_MARGIN)
+    s = d[:,:,0].astype(np.uint16)
+    s += d[:,:,1]
+    s += d[:,:,2]
+    return s < FX_KEEP_FROM
+
+def border_connected(mask):
+    """mask 중 이미지 테두리에 닿은 연결 성분만 남긴 마스크 (scipy 라벨링, 파이썬 BFS 없음)"""
+    labels, n = ndimage.label(mask, structure=BG_CONNECTIVITY)
+    if n == 0:
+        return mask
+    edge = np.concatenate([labels[0], labels[-1], labels[:, 0], labels[:, -1]])
+    touching = np.zeros(n + 1, dtype=bool)
+    touching[edge] = True
+    touching[0] = False
+    return touching[labels]
+
+def make_transparent(img, key="dark"):
+    """투명화 v12: 테두리와 연결된 배경 영역만 제거
+    dark면 그 영역에 FX 알파 램프(어두울수록 투명)를 적용해 경계를 부드럽게,
+    chroma면 그 영역을 완전히 투명하게. 테두리에 닿지 않은 어두운/초록 픽셀은 그대로."""
+    img = img.convert("RGBA")
+    d = np.array(img)
+    bg = border_connected(background_mask(d, key))
+    if key == "chroma":
+        d[:,:,3][bg] = 0
+    else:
+        s = d[:,:,0].astype(np.uint16)
+        s += d[:,:,1]
+        s += d[:,:,2]
+        np.copyto(d[:,:,3], FX_ALPHA_LUT[s], where=bg)
+    return Image.fromarray(d)
+
+# 밝기합(R+G+B, 0~765) → 알파 LUT
+#   합 < 120 (평균 < 40): 0 / 120~239 (평균 40~79): 선형 램프 / 240 이상: 원래 알파 유지
+FX_KEEP_FROM = 240
+_fx_bright = np.arange(766) / 3
+FX_ALPHA_LUT = np.where(_fx_bright < 40, 0,
+                        np.clip((_fx_bright - 40) / 40, 0, 1) * 255).astype(np.uint8)
 
 def make_transparent_fx(img):
     """투명화 v11-FX: 검정 배경 제거
-    어두운 픽셀(밝기 < 40) = 배경 → 투명"""
+    어두운 픽셀(밝기 < 40) = 배경 → 투명, 40~80은 밝기에 비례한 반투명.
+    uint16 밝기합 + FX_ALPHA_LUT 한 번 조회로 알파 채널을 제자리 갱신."""
     img = img.convert("RGBA")
     d = np.array(img)
-    r, g, b = d[:,:,0].astype(int), d[:,:,1].astype(int), d[:,:,2].astype(int)
-    brightness = (r + g + b) / 3
-    dark = brightness < 40
-    d[:,:,3][dark] = 0
-    semi = (brightness >= 40) & (brightness < 80)
-    alpha_ratio = (brightness[semi] - 40) / 40
-    d[:,:,3][semi] = (alpha_ratio * 255).astype(np.uint8)
+    s = d[:,:,0].astype(np.uint16)
+    s += d[:,:,1]
+    s += d[:,:,2]
+    np.copyto(d[:,:,3], FX_ALPHA_LUT[s], where=s < FX_KEEP_FROM)
     return Image.fromarray(d)
 
+# ━━ 요청 속도 제한 (토큰 버킷) ━━
+class TokenBucket:
+    """분당 rpm회까지 요청을 허용하는 스레드 안전 토큰 버킷.
+    burst개까지는 즉시 통과, 이후에는 rpm/60 초당 속도로 토큰이 찬다."""
+
+    def __init__(self, rpm, burst=1):
+        self.rate = rpm / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+        self.acquired = 0
+        self.started = self.last
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기, 대기한 초를 반환"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.acquired += 1
+                    return waited
+                need = (1 - self.tokens) / self.rate
+            time.sleep(need)
+            waited += need
+
+    def achieved_rpm(self):
+        """시작 이후 실제 분당 요청 수"""
+        elapsed = time.monotonic() - self.started
+        return self.acquired / elapsed * 60 if elapsed > 0 else 0.0
+
 # ━━ API ━━
-def get_token():
-    c = service_account.Credentials.from_service_account_file(
-        KEY_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"])
-    c.refresh(Request())
-    return c.token
-
-def gen_image(prompt, aspect):
-    url = (f"https://{LOCATION}-aiplatform.googleapis.com/v1/projects/"
-           f"{PROJECT_ID}/locations/{LOCATION}/publishers/google/"
-           f"models/{MODEL_ID}:predict")
-    payload = {
-        "instances": [{"prompt": prompt}],
-        "parameters": {"sampleCount": 1, "aspectRatio": aspect,
-                       "outputOptions": {"mimeType": "image/png"}}
-    }
+def gen_raw(prompt, aspect, bucket=None, fresh=False, samples=1, stats=None):
+    """후보 원본 PNG 바이트 목록 — 캐시된 원본이 있으면 재사용, 없으면 API 생성 후 캐시에 보관
+    samples > 1이면 한 번의 예측 요청으로 여러 장을 받는다.
+    stats(dict)가 주어지면 요청 수/마지막 오류를 기록한다."""
+    keys = [gen_cache.cache_key(prompt, aspect, MODEL_ID, k) for k in range(samples)]
+    if not fresh:
+        cached = [gen_cache.load(key) for key in keys]
+        if all(cached):
+            print(f"  💾 캐시 원본 사용 ({samples}장)")
+            return cached
+    datas = fetch_pngs(prompt, aspect, bucket, samples, stats)
+    for key, data in zip(keys, datas):
+        gen_cache.store(key, data)
+    return datas
+
+def fetch_pngs(prompt, aspect, bucket=None, samples=1, stats=None):
+    """API 호출 → 디코딩된 원본 PNG 바이트 목록 (실패 시 빈 목록)
+    429/5xx/네트워크 오류는 Retry-After·jitter 백오프로 재시도,
+    모든 요청이 BREAKER를 공유해 오류율이 치솟으면 전체가 잠시 멈춘다.
+    브레이커에는 성공과 재시도 대상 실패만 기록한다 (4xx 클라이언트 오류는 제외)."""
+    client = get_client(KEY_PATH, PROJECT_ID, LOCATION, MODEL_ID)
+    stats = stats if stats is not None else {}
     for attempt in range(MAX_RETRY):
+        BREAKER.wait()
+        if bucket:
+            bucket.acquire()
+        stats["requests"] = stats.get("requests", 0) + 1
+        retry_after = None
         try:
-            r = http_requests.post(url,
-                headers={"Authorization": f"Bearer {get_token()}",
-                         "Content-Type": "application/json"},
-                json=payload, timeout=120)
+            r = client.predict(prompt, aspect, sample_count=samples, timeout=120, stream=True)
+            # 400 등 요청 자체의 문제(프롬프트 거부)는 서버 상태와 무관 → 브레이커에 세지 않음
+            if r.status_code == 200 or r.status_code in RETRYABLE:
+                BREAKER.record(r.status_code == 200)
             if r.status_code == 200:
-                preds = r.json().get("predictions", [])
-                if preds and preds[0].get("bytesBase64Encoded"):
-                    return Image.open(BytesIO(base64.b64decode(preds[0]["bytesBase64Encoded"])))
-                print("  ❌ 결과 없음"); return None
-            elif r.status_code == 429:
-                wait = WAIT_SEC * (attempt + 2)
-                print(f"  ⚠️ 429 ({attempt+1}/{MAX_RETRY}), {wait}초 대기...")
-                time.sleep(wait)
-            else:
-                print(f"  ❌ {r.status_code}: {r.text[:120]}")
-                return None
+                # 응답을 통째로 json()하지 않고 base64를 청크 단위로 바로 디코딩
+                datas = [d for d in read_predictions(r) if d]
+                if datas:
+                    return datas
+                stats["error"] = "결과 없음"
+                print("  ❌ 결과 없음"); return []
+            stats["error"] = f"{r.status_code}: {r.text[:120]}"
+            reason = str(r.status_code)
+            if r.status_code not in RETRYABLE:
+                print(f"  ❌ {stats['error']}")
+                return []
+            retry_after = retry_after_sec(r)
         except Exception as e:
-            print(f"  🚨 {e}")
-            if attempt < MAX_RETRY - 1: time.sleep(10)
-    return None
+            BREAKER.record(False)
+            stats["error"] = reason = str(e)
+        if attempt < MAX_RETRY - 1:
+            wait = backoff_delay(attempt, retry_after, base=WAIT_SEC)
+            print(f"  ⚠️ {reason[:60]} ({attempt+1}/{MAX_RETRY}), {wait:.1f}초 대기...")
+            time.sleep(wait)
+        else:
+            print(f"  ❌ {stats['error'][:120]}")
+    return []
+
+# ━━ 후보 선택 (멀티 샘플) ━━
+def postprocess(j, img):
+    """작업 설정에 맞는 투명화 적용"""
+    if not j["t"]:
+        return img
+    if j.get("fx"):
+        return make_transparent_fx(img)
+    return make_transparent(img, j.get("key", "dark"))
+
+def score_candidate(j, img):
+    """후보 1장 투명화 + check_transparency 지표 측정"""
+    out = postprocess(j, img)
+    ratio, edge = measure_transparency(np.asarray(out.convert("RGBA"))[..., 3])
+    return out, ratio, edge, diagnose(ratio, edge)
+
+def pick_best(j, imgs):
+    """후보들을 병렬 채점 → (최선 이미지, 나머지 이미지 목록)
+    기준: 불량 판정 없음 > 가장자리 불투명 비율 낮음 > 투명 비율 높음"""
+    with ThreadPoolExecutor(max_workers=len(imgs)) as pool:
+        scored = list(pool.map(lambda im: score_candidate(j, im), imgs))
+    for k, (_, ratio, edge, reason) in enumerate(scored):
+        print(f"  🔎 후보 {k}: 투명 {ratio:.0%} | 가장자리 {edge:.0%} {reason}")
+    ranked = sorted(scored, key=lambda c: (bool(c[3]), c[2], -c[1]))
+    return ranked[0][0], [c[0] for c in ranked[1:]]
+
+def archive_candidates(rel_path, datas):
+    """선택되지 않은 후보(PNG 바이트) 보관 (게임 에셋 폴더 밖)"""
+    stem = os.path.splitext(rel_path)[0]
+    for k, data in enumerate(datas, 1):
+        fp = os.path.join(ARCHIVE_DIR, f"{stem}_c{k}.png")
+        os.makedirs(os.path.dirname(fp), exist_ok=True)
+        save_atomic(fp, data=data)
+
+def encode_png(img):
+    buf = BytesIO()
+    img.save(buf, "PNG")
+    return buf.getvalue()
+
+def process_candidates(j, datas):
+    """CPU 단계 (프로세스 풀에서 실행): 디코딩 → 투명화/채점 → PNG 인코딩
+    → (최선 PNG 바이트, 나머지 PNG 바이트 목록)"""
+    if not j["t"]:
+        return datas[0], []  # 픽셀 작업 없음 → 원본 바이트 그대로
+    imgs = [Image.open(BytesIO(data)) for data in datas]
+    if len(imgs) > 1:
+        img, rest = pick_best(j, imgs)
+        return encode_png(img), [encode_png(im) for im in rest]
+    return encode_png(postprocess(j, imgs[0])), []
 
 # ━━ 스타일 (v12: 게임풍 스타일 + NO black) ━━
 NO_BLACK = "Absolutely NO black color, NO dark shading, NO dark gray. Use only bright saturated vibrant colors. Even shadows should be colored (blue/purple shadows), never black or dark gray"
@@ -164,7 +328,7 @@ def build_hero_jobs():
         base = HERO_BASE[hid]
         for tier_name, skin_desc in skin_list:
             jobs.append({
-                "p": f"heroes/{hid}_{tier_name}_sprites.png", "a": "1:1", "t": True, "fx": True,
+                "p": f"heroes/{hid}_{tier_name}_sprites.png", "a": "1:1", "t": True,
                 "q": f"{HERO}. A single cute chibi {base}, {skin_desc}. Standing idle pose, facing slightly right, centered in frame. Glowing vibrant colors. {BG_BLACK}."
             })
     return jobs
@@ -248,7 +412,7 @@ def build_enemy_jobs():
     for ch_enemies in [ch1, ch2, ch3, ch4, ch5]:
         for eid, desc in ch_enemies:
             size = "Large imposing" if "boss" in eid.lower() else "Small cute"
-            jobs.append({"p":f"enemies/{eid}.png","a":"1:1","t":True,"fx":True,
+            jobs.append({"p":f"enemies/{eid}.png","a":"1:1","t":True,
                 "q":f"{ENEMY}. {size} {desc}. Dynamic pose, facing left. Glowing vibrant colors, cel-shaded. {BG_BLACK}."})
     return jobs
 
@@ -262,7 +426,7 @@ def build_tower_jobs():
     tiers = ["basic wooden, simple, small","reinforced stone and metal, glowing runes, medium","ultimate golden ornate, crystalline magical energy, large magnificent"]
     for tid, tdesc in towers:
         for t, tt in enumerate(tiers, 1):
-            jobs.append({"p":f"towers/tower_{tid}_{t}.png","a":"1:1","t":True,"fx":True,
+            jobs.append({"p":f"towers/tower_{tid}_{t}.png","a":"1:1","t":True,
                 "q":f"{TOWER}. {tdesc}, {tt}. 3/4 isometric angle. Glowing vibrant colors. {BG_BLACK}."})
     
     branches = [("rocketBattery","Hwacha rocket launcher tower, rows of rockets, fiery smoke"),
@@ -276,17 +440,17 @@ def build_tower_jobs():
                 ("phoenixTotem","phoenix nest guardian totem, golden egg, fire feather rain effect"),
                 ("earthSpiritAltar","jade earth spirit altar, moss covered boulders, green rune glow")]
     for bid, bdesc in branches:
-        jobs.append({"p":f"towers/tower_{bid}.png","a":"1:1","t":True,"fx":True,
+        jobs.append({"p":f"towers/tower_{bid}.png","a":"1:1","t":True,
             "q":f"{TOWER}. Ultimate tier 4 branch: {bdesc}. Magnificent glowing. 3/4 angle. {BG_BLACK}."})
     return jobs
 
 def build_misc_jobs():
     jobs = []
     jobs += [
-        {"p":"objects/obj_sacred_tree.png","a":"1:1","t":True,"fx":True,"q":f"{TOWER}. Korean sacred Dangsan tree, gnarled ancient trunk, cherry blossoms, colored prayer ribbons, golden glow. Glowing vibrant. {BG_BLACK}."},
-        {"p":"objects/obj_shrine.png","a":"1:1","t":True,"fx":True,"q":f"{TOWER}. Korean stone cairn shrine (Seonghwangdang), stacked prayer stones, small wooden gate, blue-purple spiritual aura. Glowing vibrant. {BG_BLACK}."},
-        {"p":"soldiers/soldier_normal.png","a":"1:1","t":True,"fx":True,"q":f"{HERO}. A Korean militia soldier (Uibyeong), blue hanbok, wooden spear, straw hat, brave face. Glowing vibrant colors. {BG_BLACK}."},
-        {"p":"soldiers/soldier_grappler.png","a":"1:1","t":True,"fx":True,"q":f"{HERO}. A heavy Korean Ssireum wrestler, big muscular body, padded vest, bandaged fists, headband. Glowing vibrant colors. {BG_BLACK}."},
+        {"p":"objects/obj_sacred_tree.png","a":"1:1","t":True,"q":f"{TOWER}. Korean sacred Dangsan tree, gnarled ancient trunk, cherry blossoms, colored prayer ribbons, golden glow. Glowing vibrant. {BG_BLACK}."},
+        {"p":"objects/obj_shrine.png","a":"1:1","t":True,"q":f"{TOWER}. Korean stone cairn shrine (Seonghwangdang), stacked prayer stones, small wooden gate, blue-purple spiritual aura. Glowing vibrant. {BG_BLACK}."},
+        {"p":"soldiers/soldier_normal.png","a":"1:1","t":True,"q":f"{HERO}. A Korean militia soldier (Uibyeong), blue hanbok, wooden spear, straw hat, brave face. Glowing vibrant colors. {BG_BLACK}."},
+        {"p":"soldiers/soldier_grappler.png","a":"1:1","t":True,"q":f"{HERO}. A heavy Korean Ssireum wrestler, big muscular body, padded vest, bandaged fists, headband. Glowing vibrant colors. {BG_BLACK}."},
     ]
     tier4_desc = "ultimate magnificent glowing outfit, majestic aura, floating celestial ribbons, master tier"
     for pid, pdesc in {
@@ -296,25 +460,130 @@ def build_misc_jobs():
         "guMiho": f"nine-tailed fox girl, amber-gold eyes, silver-white hair, fluffy fox ears. {tier4_desc}",
         "sua": f"water ghost Sua, cyan-glowing eyes, long wet black hair, pale porcelain face. {tier4_desc}",
     }.items():
-        jobs.append({"p":f"portraits/portrait_{pid}.png","a":"1:1","t":True,"fx":True,
+        jobs.append({"p":f"portraits/portrait_{pid}.png","a":"1:1","t":True,
             "q":f"{PORT}. Close-up bust portrait of {pdesc}. Beautiful detailed anime eyes, glossy hair highlights. Glowing vibrant. {BG_BLACK}."})
     
     jobs += [
-        {"p":"ui/icon_coin.png","a":"1:1","t":True,"fx":True,"q":f"{UI}. Golden Korean brass coin (Yeopjeon), square hole center, embossed characters, golden glow. Glowing vibrant. {BG_BLACK}."},
-        {"p":"ui/icon_gem.png","a":"1:1","t":True,"fx":True,"q":f"{UI}. Jade gemstone (Gogok), comma-shaped, emerald green, inner mystical glow. Glowing vibrant. {BG_BLACK}."},
-        {"p":"ui/icon_sinmyeong.png","a":"1:1","t":True,"fx":True,"q":f"{UI}. Divine spirit energy symbol (Sinmyeong), swirling blue-gold sacred flame. Glowing vibrant. {BG_BLACK}."},
-        {"p":"ui/shop_starter_pack.png","a":"1:1","t":True,"fx":True,"q":f"{UI}. Starter treasure chest overflowing with gold coins, jade gems, magical scroll, wooden chest with golden clasps. Glowing vibrant. {BG_BLACK}."},
-        {"p":"ui/shop_gems_pack.png","a":"1:1","t":True,"fx":True,"q":f"{UI}. Golden ornate bowl overflowing with jade gemstones of various sizes, emerald glow. Glowing vibrant. {BG_BLACK}."},
+        {"p":"ui/icon_coin.png","a":"1:1","t":True,"q":f"{UI}. Golden Korean brass coin (Yeopjeon), square hole center, embossed characters, golden glow. Glowing vibrant. {BG_BLACK}."},
+        {"p":"ui/icon_gem.png","a":"1:1","t":True,"q":f"{UI}. Jade gemstone (Gogok), comma-shaped, emerald green, inner mystical glow. Glowing vibrant. {BG_BLACK}."},
+        {"p":"ui/icon_sinmyeong.png","a":"1:1","t":True,"q":f"{UI}. Divine spirit energy symbol (Sinmyeong), swirling blue-gold sacred flame. Glowing vibrant. {BG_BLACK}."},
+        {"p":"ui/shop_starter_pack.png","a":"1:1","t":True,"q":f"{UI}. Starter treasure chest overflowing with gold coins, jade gems, magical scroll, wooden chest with golden clasps. Glowing vibrant. {BG_BLACK}."},
+        {"p":"ui/shop_gems_pack.png","a":"1:1","t":True,"q":f"{UI}. Golden ornate bowl overflowing with jade gemstones of various sizes, emerald glow. Glowing vibrant. {BG_BLACK}."},
     ]
     return jobs
 
-# ━━ 실행 ━━
+# ━━ 실행: 생성 → 투명화 → 저장 3단계 파이프라인 ━━
+#   fetch (asyncio + 스레드, 네트워크 대기) → process (프로세스 풀, CPU)
+#   → write (디스크). 단계 사이 큐는 QUEUE_SIZE로 제한 → 메모리 일정
+#   투명화 없는 작업(t=False)은 process를 건너뛰고 원본 PNG 바이트를 그대로 저장
+_DONE = None  # 단계 종료 신호
+
+async def fetch_stage(feed, process_q, write_q, total, bucket, journal, args, results):
+    while True:
+        try:
+            i, j = feed.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        fp = os.path.join(BASE_DIR, j["p"])
+        print(f"[{i}/{total}] 🎨 {j['p']}")
+        journal.start(fp, category_of(j["p"]))
+        stats = {}
+        # 배경(투명화 없음)은 채점 기준이 없으므로 항상 1장
+        n = args.samples if j["t"] else 1
+        try:
+            datas = await asyncio.to_thread(gen_raw, j["q"], j["a"], bucket, args.fresh, n, stats)
+        except Exception as e:
+            stats["error"] = str(e)
+            datas = []
+        if not datas:
+            print(f"  ❌ 실패: {j['p']}")
+            journal.fail(fp, stats.get("error", "생성 실패"), stats.get("requests", 0))
+            results["fail"] += 1
+            continue
+        if j["t"]:
+            await process_q.put((j, datas, stats))
+        else:
+            # 투명화 없는 배경: 디코딩/재인코딩 없이 원본 바이트를 바로 저장
+            await write_q.put((j, datas[0], [], stats))
+
+async def process_stage(in_q, out_q, cpu_pool, journal, results):
+    loop = asyncio.get_running_loop()
+    while (item := await in_q.get()) is not _DONE:
+        j, datas, stats = item
+        try:
+            best, rest = await loop.run_in_executor(cpu_pool, process_candidates, j, datas)
+        except Exception as e:
+            print(f"  🚨 {j['p']}: {e}")
+            journal.fail(os.path.join(BASE_DIR, j["p"]), e, stats.get("requests", 0))
+            results["fail"] += 1
+            continue
+        await out_q.put((j, best, rest, stats))
+
+async def write_stage(in_q, journal, results):
+    while (item := await in_q.get()) is not _DONE:
+        j, best, rest, stats = item
+        fp = os.path.join(BASE_DIR, j["p"])
+        try:
+            os.makedirs(os.path.dirname(fp), exist_ok=True)
+            await asyncio.to_thread(save_atomic, fp, None, best)
+            if rest:
+                await asyncio.to_thread(archive_candidates, j["p"], rest)
+        except Exception as e:
+            print(f"  🚨 {j['p']}: {e}")
+            journal.fail(fp, e, stats.get("requests", 0))
+            results["fail"] += 1
+            continue
+        journal.finish(fp, stats.get("requests", 0))
+        results["ok"] += 1
+        print(f"  ✅ {fp}")
+
+async def run_pipeline(pending, total, bucket, journal, args):
+    """대기 작업 전체를 파이프라인으로 처리 → {"ok": n, "fail": n}"""
+    results = {"ok": 0, "fail": 0}
+    feed = asyncio.Queue()
+    for item in pending:
+        feed.put_nowait(item)
+    process_q = asyncio.Queue(maxsize=QUEUE_SIZE)
+    write_q = asyncio.Queue(maxsize=QUEUE_SIZE)
+    with ProcessPoolExecutor(max_workers=args.procs) as cpu_pool:
+        fetchers = [asyncio.create_task(fetch_stage(feed, process_q, write_q, total, bucket, journal, args, results))
+                    for _ in range(args.workers)]
+        processors = [asyncio.create_task(process_stage(process_q, write_q, cpu_pool, journal, results))
+                      for _ in range(args.procs)]
+        writer = asyncio.create_task(write_stage(write_q, journal, results))
+        await asyncio.gather(*fetchers)
+        for _ in processors:
+            await process_q.put(_DONE)
+        await asyncio.gather(*processors)
+        await write_q.put(_DONE)
+        await writer
+    return results
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--only", type=str, default=None,
                        help="특정 카테고리만 생성: bg/heroes/effects/enemies/towers/misc")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                       help=f"동시 요청 수 (기본 {WORKERS})")
+    parser.add_argument("--rpm", type=int, default=RATE_RPM,
+                       help=f"분당 요청 한도 (기본 {RATE_RPM})")
+    parser.add_argument("--procs", type=int, default=PROCS,
+                       help=f"투명화 프로세스 수 (기본 {PROCS})")
+    parser.add_argument("--samples", type=int, default=SAMPLES,
+                       help=f"투명화 에셋 요청당 후보 수, 최선 1장 저장 (기본 {SAMPLES}, 최대 4)")
+    parser.add_argument("--stats", action="store_true",
+                       help="작업 저널의 카테고리별 통계만 출력")
+    parser.add_argument("--redo", action="store_true",
+                       help="이미 있는 파일도 다시 처리 (캐시 원본 사용)")
+    parser.add_argument("--fresh", action="store_true",
+                       help="캐시를 무시하고 API로 새로 생성")
     args = parser.parse_args()
     
+    journal = JobJournal()
+    if args.stats:
+        journal.print_stats()
+        return
+    
     all_jobs = {
         "bg": build_bg_jobs(),
         "heroes": build_hero_jobs(),
@@ -338,45 +607,34 @@ def main():
     
     total = len(jobs)
     print("=" * 60)
-    print(f"  🦉 해원의 문 — 에셋 팩토리 v7 (크로마키 초록)")
-    print(f"  총: {total}개 | 대기: {WAIT_SEC}초 | 재시도: {MAX_RETRY}회")
-    print(f"  배경: 크로마키 초록(#00FF00) | 투명화: 외곽 flood fill")
+    print(f"  🦉 해원의 문 — 에셋 팩토리 v7")
+    print(f"  총: {total}개 | 동시: {args.workers}개 | 투명화: {args.procs}프로세스 | 한도: 분당 {args.rpm}회 | 재시도: {MAX_RETRY}회")
+    print(f"  투명화: 캐릭터/오브젝트 외곽 연결 flood fill | 이펙트 FX 밝기 기준")
     print("=" * 60)
     
     ok = skip = fail = 0
+    pending = []
     for i, j in enumerate(jobs, 1):
         fp = os.path.join(BASE_DIR, j["p"])
-        if os.path.exists(fp):
+        if journal.is_done(fp) and not (args.redo or args.fresh):
             print(f"⏭️ [{i}/{total}] {j['p']} — 스킵")
             skip += 1
             continue
-        
-        os.makedirs(os.path.dirname(fp), exist_ok=True)
-        print(f"\n[{i}/{total}] 🎨 {j['p']}")
-        
-        img = gen_image(j["q"], j["a"])
-        if not img:
-            print("  ❌ 실패")
-            fail += 1
-            time.sleep(WAIT_SEC)
-            continue
-        
-        if j["t"]:
-            if j.get("fx"):
-                print("  ✂️ 검정 배경 → 투명 (FX)...")
-                img = make_transparent_fx(img)
-            else:
-                print("  ✂️ 배경 → 투명 (rembg)...")
-                img = make_transparent(img)
-        
-        img.save(fp, "PNG")
-        print(f"  ✅ {fp}")
-        ok += 1
-        print(f"  ⏳ {WAIT_SEC}초...")
-        time.sleep(WAIT_SEC)
+        pending.append((i, j))
+    
+    bucket = TokenBucket(args.rpm, burst=min(args.workers, args.rpm))
+    started = time.monotonic()
+    results = asyncio.run(run_pipeline(pending, total, bucket, journal, args))
+    ok, fail = results["ok"], results["fail"]
+    elapsed = time.monotonic() - started
     
     print(f"\n{'='*60}")
     print(f"🎉 성공: {ok} | 스킵: {skip} | 실패: {fail} | 전체: {total}")
+    if pending:
+        print(f"⏱️ {elapsed:.0f}초 | 에셋 {(ok + fail) / elapsed * 60:.1f}개/분 | "
+              f"요청 {bucket.acquired}회 = 분당 {bucket.achieved_rpm():.1f}회 (한도 {args.rpm}회)")
+    print()
+    journal.print_stats()
 
 if __name__ == "__main__":
     main()
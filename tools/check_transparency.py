@@ -1,12 +1,70 @@
 import os
+import io
+import csv
+import json
+import time
+import hashlib
+import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from PIL import Image
 import numpy as np
+from job_journal import save_atomic
 
 # 검사할 폴더들 (배경 제외)
 TARGET_FOLDERS = ["enemies", "heroes", "towers", "projectiles", "objects", "fx", "soldiers", "portraits", "ui"]
 BASE_DIR = Path(r"e:\defense\assets\images")
 
+# 정상 판정 기준
+MIN_TRANSPARENT_RATIO = 0.15   # 전체 투명 픽셀 비율 하한
+MAX_OPAQUE_EDGE_RATIO = 0.3    # 가장자리 불투명 픽셀 비율 상한
+
+# 증분 검사 캐시: 경로 → 크기/mtime/sha256 + 측정값. 바뀐 파일만 다시 디코딩
+CACHE_PATH = Path(__file__).resolve().parent.parent / ".transparency_cache.json"
+CACHE_VERSION = 2              # 측정 방식이 바뀌면 올려서 기존 항목을 다시 디코딩
+SCAN_WORKERS = min(8, os.cpu_count() or 2)
+
+# 품질 리포트 (--report): 읽기 전용, 파일별 지표 → 폴더별 백분위/히스토그램
+REPORT_METRICS = ["ratio", "edge", "bbox_fill", "bbox_cover", "dark_residue", "width", "height"]
+REPORT_PERCENTILES = [5, 25, 50, 75, 95]
+HIST_BINS = 10                 # 0~1 지표 히스토그램 칸 수
+DARK_RESIDUE_SUM = 120         # 보이는 픽셀 중 R+G+B가 이 값 미만 = 검정 배경 찌꺼기
+
+def measure_transparency(alpha):
+    """알파 채널 → (전체 투명 비율, 가장자리 불투명 비율)"""
+    h, w = alpha.shape[:2]
+    total_pixels = h * w
+    transparent_pixels = np.sum(alpha == 0)
+    ratio = transparent_pixels / total_pixels
+    
+    # 가장자리(테두리) 픽셀 추출 (위, 아래, 왼쪽, 오른쪽)
+    # 게임 에셋은 가장자리가 무조건 투명해야 정상적인 배경 제거 상태임
+    edges = np.concatenate([
+        alpha[0, :],        # 상단 테두리
+        alpha[-1, :],       # 하단 테두리
+        alpha[:, 0],        # 좌측 테두리
+        alpha[:, -1]        # 우측 테두리
+    ])
+    opaque_edge_ratio = np.sum(edges > 50) / len(edges)
+    return ratio, opaque_edge_ratio
+
+def diagnose(ratio, opaque_edge_ratio):
+    """불량 사유 (정상이면 빈 문자열)"""
+    # 문제 조건 1: 전체 투명도가 15% 미만인 경우 (흰 배경이 그대로 남았을 확률 높음)
+    if ratio < MIN_TRANSPARENT_RATIO:
+        return f"전체 투명도 부족 ({ratio*100:.1f}%)"
+    # 문제 조건 2: 가장자리 픽셀 중 불투명한 픽셀이 30% 이상인 경우 (배경 제거 안 됨)
+    if opaque_edge_ratio > MAX_OPAQUE_EDGE_RATIO:
+        return f"가장자리 불투명 찌꺼기 존재 ({opaque_edge_ratio*100:.1f}%)"
+    return ""
+
+def remove_white_bg(data):
+    """RGBA 배열에서 흰색/밝은 회색(R,G,B > 180) 픽셀을 제자리에서 투명화"""
+    r, g, b = data[:,:,0], data[:,:,1], data[:,:,2]
+    bg_mask = (r > 180) & (g > 180) & (b > 180)
+    data[bg_mask, 3] = 0
+    return data
+
 def check_and_fix_transparency(filepath):
     try:
         img = Image.open(filepath)
@@ -14,45 +72,15 @@ def check_and_fix_transparency(filepath):
             img = img.convert("RGBA")
             
         data = np.array(img)
-        h, w = data.shape[:2]
-        
-        # 알파 채널 분석
-        alpha = data[..., 3]
-        total_pixels = h * w
-        transparent_pixels = np.sum(alpha == 0)
-        ratio = transparent_pixels / total_pixels
-        
-        # 가장자리(테두리) 픽셀 추출 (위, 아래, 왼쪽, 오른쪽)
-        # 게임 에셋은 가장자리가 무조건 투명해야 정상적인 배경 제거 상태임
-        edges = np.concatenate([
-            alpha[0, :],        # 상단 테두리
-            alpha[-1, :],       # 하단 테두리
-            alpha[:, 0],        # 좌측 테두리
-            alpha[:, -1]        # 우측 테두리
-        ])
-        
-        opaque_edge_ratio = np.sum(edges > 50) / len(edges)
         
-        needs_fix = False
-        reason = ""
-        
-        # 문제 조건 1: 전체 투명도가 15% 미만인 경우 (흰 배경이 그대로 남았을 확률 높음)
-        if ratio < 0.15:
-            needs_fix = True
-            reason = f"전체 투명도 부족 ({ratio*100:.1f}%)"
-            
-        # 문제 조건 2: 가장자리 픽셀 중 불투명한 픽셀이 30% 이상인 경우 (배경 제거 안 됨)
-        elif opaque_edge_ratio > 0.3:
-            needs_fix = True
-            reason = f"가장자리 불투명 찌꺼기 존재 ({opaque_edge_ratio*100:.1f}%)"
+        ratio, opaque_edge_ratio = measure_transparency(data[..., 3])
+        reason = diagnose(ratio, opaque_edge_ratio)
+        needs_fix = bool(reason)
             
         if needs_fix:
             print(f"⚠️ 불량 의심 에셋 발견: {filepath.name} - {reason}")
             # 강력한 투명화 재적용 (흰색 / 밝은 회색 계열 배경을 모두 강제로 날림)
-            r, g, b, a = data[:,:,0], data[:,:,1], data[:,:,2], data[:,:,3]
-            # (R>200, G>200, B>200) 이면서 가장자리에 연결된 배경을 투명으로
-            bg_mask = (r > 180) & (g > 180) & (b > 180)
-            data[bg_mask, 3] = 0
+            remove_white_bg(data)
             
             fixed_img = Image.fromarray(data, "RGBA")
             fixed_img.save(filepath, "PNG")
@@ -64,29 +92,205 @@ def check_and_fix_transparency(filepath):
         print(f"❌ 파일 검사 오류 {filepath.name}: {e}")
         return False
 
+def load_cache(path=CACHE_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_cache(cache, path=CACHE_PATH):
+    save_atomic(path, data=json.dumps(cache, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def measure_file(filepath, entry=None):
+    """파일 → (캐시 항목, 디코딩 여부)
+    크기+mtime이 같으면 캐시 그대로, mtime만 바뀌었으면 해시 비교 후 같으면 재사용,
+    내용이 바뀐 경우에만 PNG를 디코딩해 알파 지표를 다시 잰다.
+    읽기/디코딩에 실패하면 ({"error": 메시지}, False) — 이 항목은 캐시에 쓰지 않는다."""
+    try:
+        return _measure_file(filepath, entry)
+    except Exception as e:
+        return {"error": str(e)}, False
+
+def _measure_file(filepath, entry):
+    if entry and entry.get("version") != CACHE_VERSION:
+        entry = None
+    st = os.stat(filepath)
+    if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+        return entry, False
+    with open(filepath, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry and entry["sha256"] == digest:
+        return dict(entry, size=st.st_size, mtime=st.st_mtime_ns), False
+    # 보정/리포트와 같은 기준: 팔레트·tRNS 투명도도 RGBA로 변환해 반영
+    img = Image.open(io.BytesIO(data))
+    alpha = np.asarray(img.convert("RGBA").getchannel("A"))
+    ratio, edge = measure_transparency(alpha)
+    return {"version": CACHE_VERSION, "size": st.st_size, "mtime": st.st_mtime_ns, "sha256": digest,
+            "ratio": float(ratio), "edge": float(edge)}, True
+
+def scan(files, cache, workers=SCAN_WORKERS):
+    """파일 목록을 병렬 측정 → (경로별 캐시 항목, 다시 디코딩한 경로 집합)"""
+    keys = [str(Path(fp).resolve()) for fp in files]
+    with ThreadPoolExecutor(workers) as pool:
+        results = list(pool.map(lambda kv: measure_file(kv[1], cache.get(kv[0])), zip(keys, files)))
+    entries = {k: entry for k, (entry, _) in zip(keys, results)}
+    return entries, {k for k, (_, decoded) in zip(keys, results) if decoded}
+
+def asset_metrics(filepath):
+    """파일 1개 품질 지표 (프로세스 풀에서 실행, 파일은 읽기만 함)
+    ratio: 투명 비율 / edge: 테두리 불투명 비율 / bbox_fill: 불투명 bbox 안의 불투명 비율
+    bbox_cover: 불투명 bbox 넓이 / 이미지 넓이 / dark_residue: 불투명 픽셀 중 거의 검정 비율
+    읽기/디코딩에 실패하면 {path, folder, error} 행 — 통계에서는 빠지고 리포트 errors에만 남는다."""
+    try:
+        return _asset_metrics(filepath)
+    except Exception as e:
+        return {"path": Path(filepath).parent.name + "/" + Path(filepath).name,
+                "folder": Path(filepath).parent.name, "error": str(e)}
+
+def _asset_metrics(filepath):
+    with Image.open(filepath) as img:
+        rgba = np.asarray(img.convert("RGBA"))
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3]
+    ratio, edge = measure_transparency(alpha)
+    opaque = alpha > 50
+    count = int(opaque.sum())
+    if count:
+        rows = np.flatnonzero(opaque.any(axis=1))
+        cols = np.flatnonzero(opaque.any(axis=0))
+        box = (rows[-1] - rows[0] + 1) * (cols[-1] - cols[0] + 1)
+        total = rgba[..., :3].sum(axis=2, dtype=np.uint16)
+        dark = int((opaque & (total < DARK_RESIDUE_SUM)).sum())
+        bbox_fill, bbox_cover, dark_residue = count / box, box / (h * w), dark / count
+    else:
+        bbox_fill = bbox_cover = dark_residue = 0.0
+    return {"path": Path(filepath).parent.name + "/" + Path(filepath).name,
+            "folder": Path(filepath).parent.name, "width": w, "height": h,
+            "ratio": float(ratio), "edge": float(edge), "bbox_fill": float(bbox_fill),
+            "bbox_cover": float(bbox_cover), "dark_residue": float(dark_residue),
+            "reason": diagnose(ratio, edge)}
+
+def summarize(rows):
+    """지표 목록 → 지표별 {mean, p5..p95, hist, bins}"""
+    summary = {"count": len(rows), "flagged": sum(1 for r in rows if r["reason"])}
+    for m in REPORT_METRICS:
+        values = np.array([r[m] for r in rows], dtype=np.float64)
+        stats = {"mean": float(values.mean())}
+        stats.update({f"p{q}": float(v) for q, v in zip(REPORT_PERCENTILES, np.percentile(values, REPORT_PERCENTILES))})
+        if m not in ("width", "height"):
+            hist, bins = np.histogram(values, bins=HIST_BINS, range=(0.0, 1.0))
+            stats["hist"] = hist.tolist()
+            stats["bins"] = [round(b, 3) for b in bins.tolist()]
+        summary[m] = stats
+    return summary
+
+def write_report(files, prefix, workers=SCAN_WORKERS):
+    """프로세스 풀로 전체 지표 측정 → prefix.json / prefix_files.csv / prefix_folders.csv
+    반환: (폴더별 요약, 읽지 못한 파일 행 목록)"""
+    with ProcessPoolExecutor(workers) as pool:
+        results = list(pool.map(asset_metrics, files, chunksize=8))
+    rows = [r for r in results if "error" not in r]
+    errors = [r for r in results if "error" in r]
+    folders = {}
+    for r in rows:
+        folders.setdefault(r["folder"], []).append(r)
+    summaries = {name: summarize(group) for name, group in sorted(folders.items())}
+    if rows:
+        summaries["all"] = summarize(rows)
+
+    with open(f"{prefix}.json", "w", encoding="utf-8") as f:
+        json.dump({"generated": time.strftime("%Y-%m-%d %H:%M:%S"), "folders": summaries, "files": rows,
+                   "errors": errors},
+                  f, ensure_ascii=False, indent=1)
+    with open(f"{prefix}_files.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, ["path", "folder"] + REPORT_METRICS + ["reason"], extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(f"{prefix}_folders.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["folder", "metric", "count", "mean"] + [f"p{q}" for q in REPORT_PERCENTILES] + ["hist"])
+        for name, summary in summaries.items():
+            for m in REPORT_METRICS:
+                st = summary[m]
+                writer.writerow([name, m, summary["count"], f"{st['mean']:.4f}"] +
+                                [f"{st[f'p{q}']:.4f}" for q in REPORT_PERCENTILES] +
+                                [" ".join(map(str, st.get("hist", [])))])
+    return summaries, errors
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", type=str, default=str(BASE_DIR))
+    parser.add_argument("--rescan", action="store_true", help="캐시 무시하고 전부 다시 디코딩")
+    parser.add_argument("--workers", type=int, default=SCAN_WORKERS)
+    parser.add_argument("--report", type=str, default=None, metavar="PREFIX",
+                        help="수정 없이 품질 리포트만: PREFIX.json / PREFIX_files.csv / PREFIX_folders.csv")
+    args = parser.parse_args()
+
     print("==========================================================")
     print("   🔍 해원의 문 - AI 에셋 정밀 투명도 100% 전수 조사")
     print("==========================================================")
     
-    fixed_count = 0
-    total_checked = 0
-    
+    files = []
     for folder in TARGET_FOLDERS:
-        folder_path = BASE_DIR / folder
-        if not folder_path.exists():
+        folder_path = Path(args.base) / folder
+        if folder_path.exists():
+            files.extend(sorted(folder_path.glob("*.png")))
+    
+    if args.report:
+        summaries, errors = write_report(files, args.report, args.workers)
+        print(f"{'폴더':<12} {'개수':>4} {'불량':>4} {'투명 p50':>9} {'테두리 p95':>10} "
+              f"{'bbox채움 p50':>12} {'검정잔여 p95':>12}")
+        for name, st in summaries.items():
+            print(f"{name:<12} {st['count']:>4} {st['flagged']:>4} {st['ratio']['p50']:>9.1%} "
+                  f"{st['edge']['p95']:>10.1%} {st['bbox_fill']['p50']:>12.1%} {st['dark_residue']['p95']:>12.1%}")
+        for r in errors:
+            print(f"❌ 파일 검사 오류 {r['path']}: {r['error']}")
+        print(f"\n📊 리포트 저장: {args.report}.json / {args.report}_files.csv / {args.report}_folders.csv")
+        return
+    
+    cache = {} if args.rescan else load_cache()
+    entries, decoded = scan(files, cache, args.workers)
+    
+    fixed_count = 0
+    unresolved = 0
+    for file in files:
+        key = str(file.resolve())
+        entry = entries[key]
+        if "error" in entry:
+            print(f"❌ 파일 검사 오류 {file.name}: {entry['error']}")
             continue
-            
-        for file in folder_path.glob("*.png"):
-            total_checked += 1
-            if check_and_fix_transparency(file):
-                fixed_count += 1
+        reason = diagnose(entry["ratio"], entry["edge"])
+        if not reason:
+            continue
+        if entry.get("fixed") and key not in decoded:
+            # 이미 한 번 보정했는데도 기준 미달 + 그 뒤로 안 바뀐 파일 → 다시 덮어쓰지 않음
+            print(f"⚠️ 보정 후에도 기준 미달 (변경 없음): {file.name} - {reason}")
+            unresolved += 1
+            continue
+        if check_and_fix_transparency(file):
+            fixed_count += 1
+            # 고친 파일은 즉시 다시 측정해 캐시에 반영
+            entries[key], _ = measure_file(file)
+            entries[key]["fixed"] = True
+    
+    # 이번 스캔 대상이 아닌 경로(다른 base 등)의 기록은 유지, 측정 실패 항목은 저장 안 함
+    errors = [k for k, e in entries.items() if "error" in e]
+    cache.update({k: e for k, e in entries.items() if "error" not in e})
+    save_cache(cache)
+    total_checked = len(files)
+    decoded = len(decoded)
                 
     print("\n==========================================================")
-    print(f"✅ 검사 완료! 총 {total_checked}개 파일 검증")
+    print(f"✅ 검사 완료! 총 {total_checked}개 파일 검증 (디코딩 {decoded}개, 캐시 {total_checked - decoded - len(errors)}개)")
+    if errors:
+        print(f"❌ 검사 오류: {len(errors)}개 파일은 읽지 못해 건너뜀")
     if fixed_count > 0:
         print(f"🛠️ 보정됨: 배경 찌꺼기가 남은 불량 에셋 {fixed_count}개를 수정 추출 완료했습니다.")
-    else:
+    if unresolved:
+        print(f"⚠️ 기준 미달: {unresolved}개 파일은 자동 보정으로 해결되지 않음 (수동 확인 필요)")
+    if not (fixed_count or unresolved or errors):
         print("✨ 완벽합니다! 모든 에셋의 투명화가 정상 기준을 통과했습니다.")
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+"""
+🦉 해원의 문 — Vertex AI Imagen 로컬 대역 서버 (부하 테스트용)
+
+:predict 요청에 미리 만들어 둔 PNG(base64)를 돌려준다. 쿼터 없이
+스케줄러/속도 제한 변경을 측정하기 위한 용도.
+  - 지연: 평균 --latency초 ± --jitter
+  - 429: --rate-429 확률로 발생, 한 번 터지면 --burst-429개 연속 (Retry-After 포함)
+  - 5xx: --rate-5xx 확률로 503
+
+사용법:
+  python tools/fake_imagen_server.py --port 8765 --latency 3 --rate-429 0.1
+  IMAGEN_ENDPOINT=http://127.0.0.1:8765 python tools/bulk_imagen_v2.py
+"""
+import io
+import json
+import time
+import base64
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from PIL import Image
+
+# aspectRatio → Imagen 3 출력 해상도
+SIZES = {
+    "1:1": (1024, 1024),
+    "16:9": (1408, 768),
+    "9:16": (768, 1408),
+    "4:3": (1280, 896),
+    "3:4": (896, 1280),
+}
+
+
+def make_canned_png(size, seed=0):
+    """검정 배경 위 밝은 원 — FX 투명화가 실제처럼 동작하는 더미 이미지"""
+    w, h = size
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w]
+    d = np.hypot(xx - w / 2, yy - h / 2) / (min(w, h) / 2)
+    glow = np.clip(1.2 - d, 0, 1)[..., None]
+    color = rng.integers(120, 256, size=3)
+    rgb = (glow * color).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(rgb, "RGB").save(buf, "PNG")
+    return buf.getvalue()
+
+
+class FakeImagen:
+    """대역 서버 동작 설정 + 상태 (핸들러 스레드 간 공유)"""
+
+    def __init__(self, latency=2.0, jitter=0.5, rate_429=0.0, burst_429=3,
+                 rate_5xx=0.0, retry_after=2, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.burst_429 = burst_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.burst_left = 0
+        self.counts = {"200": 0, "429": 0, "5xx": 0}
+        self.pngs = {aspect: base64.b64encode(make_canned_png(size, i)).decode("ascii")
+                     for i, (aspect, size) in enumerate(SIZES.items())}
+
+    def decide(self):
+        """이번 요청의 결과 코드 + 지연 초"""
+        with self.lock:
+            delay = max(0.0, self.rng.gauss(self.latency, self.jitter))
+            if self.burst_left > 0:
+                self.burst_left -= 1
+                code = 429
+            elif self.rng.random() < self.rate_429:
+                self.burst_left = self.burst_429 - 1
+                code = 429
+            elif self.rng.random() < self.rate_5xx:
+                code = 503
+            else:
+                code = 200
+            self.counts["200" if code == 200 else "429" if code == 429 else "5xx"] += 1
+            # 거절 응답은 빠르게 돌아온다
+            return code, delay if code == 200 else min(delay, 0.05)
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, code, body, headers=()):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in headers:
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            req = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.endswith(":predict"):
+                return self._reply(404, {"error": {"message": "not found"}})
+            code, delay = fake.decide()
+            time.sleep(delay)
+            if code == 429:
+                return self._reply(429, {"error": {"code": 429, "message": "Quota exceeded"}},
+                                   [("Retry-After", str(fake.retry_after))])
+            if code != 200:
+                return self._reply(code, {"error": {"code": code, "message": "Service unavailable"}})
+            params = req.get("parameters", {})
+            b64 = fake.pngs.get(params.get("aspectRatio", "1:1"), fake.pngs["1:1"])
+            n = int(params.get("sampleCount", 1))
+            self._reply(200, {"predictions": [{"bytesBase64Encoded": b64, "mimeType": "image/png"}] * n})
+
+    return Handler
+
+
+def start_server(fake, host="127.0.0.1", port=0):
+    """백그라운드 스레드로 서버 시작 → (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=2.0, help="평균 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="지연 표준편차(초)")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 버스트 시작 확률")
+    parser.add_argument("--burst-429", type=int, default=3, help="429 버스트 길이")
+    parser.add_argument("--rate-5xx", type=float, default=0.0, help="503 확률")
+    parser.add_argument("--retry-after", type=int, default=2, help="429 Retry-After 초")
+    args = parser.parse_args()
+
+    fake = FakeImagen(args.latency, args.jitter, args.rate_429, args.burst_429,
+                      args.rate_5xx, args.retry_after)
+    server, url = start_server(fake, port=args.port)
+    print(f"🧪 Imagen 대역 서버: {url}")
+    print(f"   IMAGEN_ENDPOINT={url} 로 생성 스크립트 실행")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"\n📊 응답: {fake.counts}")
+
+
+if __name__ == "__main__":
+    main()
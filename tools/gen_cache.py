@@ -0,0 +1,45 @@
+"""
+🦉 해원의 문 — 생성 원본 캐시 (content-addressed)
+
+Imagen이 돌려준 원본 PNG 바이트를 hash(prompt, aspect, model) 키로 보관.
+투명화 설정만 바꿔서 다시 돌릴 때 API를 다시 부르지 않고 원본을 재사용한다.
+
+  .imagen_cache/ab/abcdef....png   (키 앞 2글자로 샤딩)
+"""
+import os
+import json
+import hashlib
+import threading
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".imagen_cache")
+
+
+def cache_key(prompt, aspect, model_id, index=0):
+    """요청 내용 (+ 멀티 샘플 번호) → sha256 키"""
+    parts = [prompt, aspect, model_id] + ([index] if index else [])
+    raw = json.dumps(parts, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_path(key, cache_dir=None):
+    return os.path.join(cache_dir or CACHE_DIR, key[:2], f"{key}.png")
+
+
+def load(key, cache_dir=None):
+    """캐시된 원본 바이트 (없으면 None)"""
+    try:
+        with open(cache_path(key, cache_dir), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def store(key, data, cache_dir=None):
+    """원본 바이트 저장 — 임시 파일 후 rename으로 반쯤 쓰인 파일 방지"""
+    fp = cache_path(key, cache_dir)
+    os.makedirs(os.path.dirname(fp), exist_ok=True)
+    tmp = f"{fp}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, fp)
+    return fp
@@ -3,17 +3,43 @@ fx/ 디렉토리에 이펙트 프레임 에셋 생성
 기존 effects/ 에셋에서 4프레임 애니메이션 세트를 생성합니다.
 
 프레임 구조: 원본 이미지를 약간씩 회전/스케일/투명도 변화를 주어 4프레임 애니메이션 생성
+
+빌드 순서 (소스 → 이펙트 의존 그래프):
+  1. 바뀐 이펙트가 쓰는 소스만 모아 한 번씩 디코딩+리사이즈 (SourceCache, 병렬)
+     fx_hit_1..4처럼 여러 이펙트가 같이 쓰는 소스도 한 번만 처리
+  2. 이펙트끼리는 서로 독립 → 스레드 풀에서 병렬 렌더링/저장
+  3. 소스 sha256 + 모드 + 파라미터가 지난 빌드와 같고 출력 파일이 그대로면 건너뜀
+     (.fx_frames_cache.json)
+  4. 지난 빌드 출력 중 이번에 안 만드는 파일(프레임 수 감소, 매핑에서 빠진 이펙트)은 삭제
+
+사용법:
+  python tools/generate_fx_frames.py            → 바뀐 이펙트만
+  python tools/generate_fx_frames.py --force    → 전부 다시 생성
 """
 
 import os
+import json
+import hashlib
+import argparse
+import threading
 from pathlib import Path
-from PIL import Image, ImageEnhance, ImageFilter
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageFilter
+import numpy as np
+from scipy import ndimage
 import math
+from job_journal import save_atomic
+from snapshot_store import file_sha256
 
 ASSETS_DIR = Path(r"e:\defense\assets\images")
 EFFECTS_DIR = ASSETS_DIR / "effects"
 FX_DIR = ASSETS_DIR / "fx"
 
+# 증분 빌드 기록: 이펙트 → 입력 키 + 출력 파일 sha256
+BUILD_CACHE_PATH = Path(__file__).resolve().parent.parent / ".fx_frames_cache.json"
+BUILD_WORKERS = min(8, os.cpu_count() or 2)
+BUILD_VERSION = 3   # 생성 코드가 바뀌면 올려서 전부 다시 생성
+
 # 출력 크기 (게임 코드에서 48~64px로 사용)
 OUTPUT_SIZE = 128
 
@@ -60,6 +86,36 @@ EFFECT_MAPPING = {
 }
 
 
+# 프레임별 파라미터 (빌드 키에 포함)
+FADE_ALPHAS = [255, 200, 130, 60]  # multi_source_fade 프레임별 투명도
+
+# single_animate 키프레임: 시각 t(0~1)에서의 스케일, 회전(도, 반시계), 밝기, 이동(px)
+# 프레임 수만큼 t를 고르게 나눠 키프레임 사이를 EASINGS 곡선으로 보간한다
+SINGLE_KEYFRAMES = [
+    {"t": 0.0,   "scale": 0.7, "rotate": 0,  "brightness": 0.9, "dx": 0, "dy": 0},   # 시작 (작게)
+    {"t": 1 / 3, "scale": 1.0, "rotate": 5,  "brightness": 1.2, "dx": 0, "dy": 0},   # 확대
+    {"t": 2 / 3, "scale": 1.1, "rotate": -5, "brightness": 1.4, "dx": 0, "dy": 0},   # 최대
+    {"t": 1.0,   "scale": 0.9, "rotate": 0,  "brightness": 0.8, "dx": 0, "dy": 0},   # 수축
+]
+SINGLE_FRAMES = 4
+SINGLE_EASING = "ease_in_out"
+
+# 키프레임 구간 안에서의 진행률 u(0~1) → 보간 비율
+EASINGS = {
+    "linear":      lambda u: u,
+    "ease_in":     lambda u: u * u,
+    "ease_out":    lambda u: 1 - (1 - u) * (1 - u),
+    "ease_in_out": lambda u: u * u * (3 - 2 * u),
+}
+
+# 모드별 기본 파라미터 — EFFECT_MAPPING 항목에 같은 키("frames", "easing" 등)를 주면 덮어씀
+MODE_PARAMS = {
+    "multi_source": {},
+    "multi_source_fade": {"alphas": FADE_ALPHAS},
+    "single_animate": {"keyframes": SINGLE_KEYFRAMES, "frames": SINGLE_FRAMES, "easing": SINGLE_EASING},
+}
+
+
 def load_and_resize(path: Path, size: int = OUTPUT_SIZE) -> Image.Image:
     """이미지를 로드하고 정사각형으로 리사이즈"""
     img = Image.open(path).convert("RGBA")
@@ -73,31 +129,51 @@ def load_and_resize(path: Path, size: int = OUTPUT_SIZE) -> Image.Image:
     return canvas
 
 
-def generate_multi_source(prefix: str, sources: list[str]):
-    """여러 소스 이미지를 각각 하나의 프레임으로 사용"""
-    for i, src_name in enumerate(sources):
-        src_path = EFFECTS_DIR / src_name
-        if not src_path.exists():
-            print(f"  ⚠️ 소스 없음: {src_name}")
-            continue
-        img = load_and_resize(src_path)
-        out_path = FX_DIR / f"{prefix}_{i}.png"
-        img.save(out_path)
-        print(f"  ✅ {out_path.name}")
+class SourceCache:
+    """소스 경로 → 리사이즈된 캔버스 (스레드 간 공유, 소스마다 한 번만 디코딩)
+    반환 이미지는 여러 이펙트가 같이 쓰므로 읽기 전용으로 다룬다."""
+
+    def __init__(self, size: int = OUTPUT_SIZE):
+        self.size = size
+        self.images = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.decoded = 0
 
+    def get(self, path: Path) -> Image.Image:
+        with self.lock:
+            key_lock = self.locks.setdefault(path, threading.Lock())
+        with key_lock:
+            if path not in self.images:
+                self.images[path] = load_and_resize(path, self.size)
+                self.decoded += 1
+            return self.images[path]
 
-def generate_multi_source_fade(prefix: str, sources: list[str]):
-    """소스를 사용하되 점점 투명해지는 사망 이펙트"""
-    alphas = [255, 200, 130, 60]  # 프레임별 투명도
-    for i, src_name in enumerate(sources):
-        src_path = EFFECTS_DIR / src_name
-        if not src_path.exists():
-            print(f"  ⚠️ 소스 없음: {src_name}")
+
+def resolve_sources(mode: str, sources: list[str]) -> list:
+    """이펙트가 실제로 쓸 소스 경로 목록 (없는 소스는 None)
+    single_animate는 첫 번째로 존재하는 소스 하나만 쓴다."""
+    paths = [EFFECTS_DIR / name for name in sources]
+    if mode == "single_animate":
+        found = next((p for p in paths if p.exists()), None)
+        return [found] if found else []
+    return [p if p.exists() else None for p in paths]
+
+
+def generate_multi_source(prefix: str, images: list):
+    """여러 소스 이미지를 각각 하나의 프레임으로 사용 → [(파일명, 이미지, 메모)]"""
+    return [(f"{prefix}_{i}.png", img, "") for i, img in enumerate(images) if img is not None]
+
+
+def generate_multi_source_fade(prefix: str, images: list, alphas: list = FADE_ALPHAS):
+    """소스를 사용하되 점점 투명해지는 사망 이펙트 (alphas: 프레임별 투명도)"""
+    frames = []
+    for i, img in enumerate(images):
+        if img is None:
             continue
-        img = load_and_resize(src_path)
         # 투명도 조절
         r, g, b, a = img.split()
-        a = a.point(lambda x: min(x, alphas[i]))
+        a = a.point(lambda x, cap=alphas[i]: min(x, cap))
         img = Image.merge("RGBA", (r, g, b, a))
         # 약간 확대 (분해 효과)
         scale = 1.0 + (i * 0.15)
@@ -107,82 +183,207 @@ def generate_multi_source_fade(prefix: str, sources: list[str]):
         canvas = Image.new("RGBA", (OUTPUT_SIZE, OUTPUT_SIZE), (0, 0, 0, 0))
         offset = (OUTPUT_SIZE - new_size) // 2
         canvas.paste(img, (offset, offset), img)
-        out_path = FX_DIR / f"{prefix}_{i}.png"
-        canvas.save(out_path)
-        print(f"  ✅ {out_path.name} (alpha={alphas[i]})")
-
-
-def generate_single_animate(prefix: str, sources: list[str]):
-    """단일 소스 이미지에서 4프레임 애니메이션 생성 (스케일+회전 변화)"""
-    # 첫 번째 소스를 기본으로, 두 번째가 있으면 교차 사용
-    src_path = EFFECTS_DIR / sources[0]
-    if not src_path.exists():
-        # 대체 소스 시도
-        if len(sources) > 1:
-            src_path = EFFECTS_DIR / sources[1]
-        if not src_path.exists():
-            print(f"  ⚠️ 소스 없음: {sources}")
-            return
-
-    base_img = load_and_resize(src_path)
-
-    # 프레임별 변형: 스케일, 회전, 밝기
-    transforms = [
-        {"scale": 0.7, "rotate": 0, "brightness": 0.9},    # 시작 (작게)
-        {"scale": 1.0, "rotate": 5, "brightness": 1.2},    # 확대
-        {"scale": 1.1, "rotate": -5, "brightness": 1.4},   # 최대
-        {"scale": 0.9, "rotate": 0, "brightness": 0.8},    # 수축
-    ]
-
-    for i, t in enumerate(transforms):
-        img = base_img.copy()
-
-        # 밝기 조절
-        enhancer = ImageEnhance.Brightness(img)
-        img = enhancer.enhance(t["brightness"])
-
-        # 회전
-        if t["rotate"] != 0:
-            img = img.rotate(t["rotate"], expand=False, resample=Image.Resampling.BICUBIC)
-
-        # 스케일
-        new_size = int(OUTPUT_SIZE * t["scale"])
-        img = img.resize((new_size, new_size), Image.Resampling.LANCZOS)
+        frames.append((f"{prefix}_{i}.png", canvas, f"alpha={alphas[i]}"))
+    return frames
 
-        # 캔버스에 중앙 배치
-        canvas = Image.new("RGBA", (OUTPUT_SIZE, OUTPUT_SIZE), (0, 0, 0, 0))
-        offset = (OUTPUT_SIZE - new_size) // 2
-        canvas.paste(img, (offset, offset), img)
 
-        out_path = FX_DIR / f"{prefix}_{i}.png"
-        canvas.save(out_path)
-        print(f"  ✅ {out_path.name} (scale={t['scale']}, rot={t['rotate']}°)")
+def ease_keyframes(keyframes: list, frames: int, easing: str = SINGLE_EASING) -> list:
+    """키프레임 → 프레임 수만큼 보간한 변형 목록 [{"scale", "rotate", "brightness", "dx", "dy"}]"""
+    ease = EASINGS[easing]
+    keys = sorted(keyframes, key=lambda k: k["t"])
+    out = []
+    for i in range(frames):
+        t = i / (frames - 1) if frames > 1 else 0.0
+        j = max([0] + [n for n in range(len(keys) - 1) if keys[n]["t"] <= t])
+        a, b = keys[j], keys[min(j + 1, len(keys) - 1)]
+        span = b["t"] - a["t"]
+        w = ease(min(1.0, max(0.0, (t - a["t"]) / span))) if span > 0 else 0.0
+        out.append({k: a.get(k, 0) + (b.get(k, 0) - a.get(k, 0)) * w
+                    for k in ("scale", "rotate", "brightness", "dx", "dy")})
+    return out
+
+
+def affine_frames(base: Image.Image, transforms: list) -> list:
+    """베이스 이미지 → 변형마다 한 장 (스케일+회전+이동을 한 행렬로 합쳐 한 번만 리샘플)
+
+    모든 프레임의 역변환 좌표를 (프레임, y, x) 격자 하나로 만들어 채널마다
+    map_coordinates 한 번으로 샘플링한다. 알파 경계가 검게 번지지 않도록
+    premultiplied 상태로 보간하고, 밝기는 샘플링 뒤 RGB에 곱한다.
+    마지막에 예전 출력과 같은 합성을 재현한다: 빈 캔버스에 자기 자신을 마스크로
+    붙이던 paste(img, pos, img) → RGB × a/255, 알파 a²/255 (글로 불투명도 유지)."""
+    rgba = np.asarray(base.convert("RGBA"), dtype=np.float64)
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3] / 255.0
+    planes = [rgba[..., c] * alpha for c in range(3)] + [rgba[..., 3]]
+
+    # 출력 픽셀 → 베이스 좌표: p = c + R(-θ)(q - c - d) / s  (θ 반시계, 화면 좌표계)
+    cy, cx = (h - 1) / 2, (w - 1) / 2
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float64)
+    coords = np.empty((2, len(transforms), h, w))
+    for f, t in enumerate(transforms):
+        theta = math.radians(t["rotate"])
+        qy, qx = yy - cy - t["dy"], xx - cx - t["dx"]
+        coords[0, f] = cy + (math.cos(theta) * qy + math.sin(theta) * qx) / t["scale"]
+        coords[1, f] = cx + (-math.sin(theta) * qy + math.cos(theta) * qx) / t["scale"]
+
+    sampled = np.stack([ndimage.map_coordinates(p, coords, order=3, mode="constant", cval=0.0)
+                        for p in planes], axis=-1)
+    a = np.clip(sampled[..., 3], 0, 255)
+    safe = np.where(a > 0, a / 255.0, 1.0)[..., None]
+    gain = np.array([t["brightness"] for t in transforms])[:, None, None, None]
+    rgb = np.clip(sampled[..., :3] / safe * gain, 0, 255)
+    coverage = (a / 255.0)[..., None]
+    rgb, a = rgb * coverage, a * coverage[..., 0]
+    out = np.concatenate([rgb, a[..., None]], axis=-1).round().astype(np.uint8)
+    out[a < 0.5] = 0
+    return [Image.fromarray(frame, "RGBA") for frame in out]
+
+
+def generate_single_animate(prefix: str, images: list, keyframes: list = SINGLE_KEYFRAMES,
+                            frames: int = SINGLE_FRAMES, easing: str = SINGLE_EASING):
+    """단일 소스 이미지에서 N프레임 애니메이션 생성 (키프레임 보간 → 프레임당 한 번 리샘플)"""
+    # 첫 번째로 존재하는 소스 하나 (resolve_sources에서 결정)
+    transforms = ease_keyframes(keyframes, frames, easing)
+    rendered = affine_frames(images[0], transforms)
+    return [(f"{prefix}_{i}.png", img, f"scale={t['scale']:.2f}, rot={t['rotate']:.1f}°")
+            for i, (img, t) in enumerate(zip(rendered, transforms))]
+
+
+GENERATORS = {
+    "multi_source": generate_multi_source,
+    "multi_source_fade": generate_multi_source_fade,
+    "single_animate": generate_single_animate,
+}
+
+
+def load_build_cache(path: Path = BUILD_CACHE_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_build_cache(cache: dict, path: Path = BUILD_CACHE_PATH):
+    save_atomic(path, data=json.dumps(cache, ensure_ascii=False, indent=1).encode("utf-8"))
+
+
+def effect_params(mode: str, config: dict) -> dict:
+    """모드 기본 파라미터 + EFFECT_MAPPING 항목의 덮어쓰기"""
+    return {k: config.get(k, v) for k, v in MODE_PARAMS[mode].items()}
+
+
+def build_key(mode: str, params: dict, paths: list, source_shas: dict) -> str:
+    """이펙트 입력(소스 내용, 모드, 파라미터, 출력 크기) → sha256"""
+    raw = json.dumps({
+        "version": BUILD_VERSION,
+        "size": OUTPUT_SIZE,
+        "mode": mode,
+        "params": params,
+        "sources": [[p.name, source_shas[p]] if p else None for p in paths],
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_fresh(entry: dict, key: str) -> bool:
+    """지난 빌드와 입력이 같고 출력 파일도 그때 그대로인지"""
+    if not entry or entry.get("key") != key:
+        return False
+    for name, sha in entry.get("outputs", {}).items():
+        out = FX_DIR / name
+        if not out.exists() or file_sha256(out) != sha:
+            return False
+    return True
+
+
+def render_effect(prefix: str, mode: str, paths: list, params: dict, cache: SourceCache):
+    """이펙트 하나 렌더링+저장 → (출력 {파일명: sha256}, 로그 줄 목록)"""
+    images = [cache.get(p) if p else None for p in paths]
+    lines = [f"  ⚠️ 소스 없음: {p}" for p, img in zip(paths, images) if img is None]
+    outputs = {}
+    for name, img, note in GENERATORS[mode](prefix, images, **params):
+        out_path = FX_DIR / name
+        img.save(out_path)
+        outputs[name] = file_sha256(out_path)
+        lines.append(f"  ✅ {name}" + (f" ({note})" if note else ""))
+    return outputs, lines
+
+
+def remove_stale(old: dict, new: dict) -> int:
+    """지난 빌드 출력 중 이번 출력에 없는 파일 삭제 (프레임 수 감소 등) → 삭제 개수"""
+    count = 0
+    for name in old:
+        if name not in new and (FX_DIR / name).exists():
+            (FX_DIR / name).unlink()
+            print(f"  🗑️ {name} (이번 빌드 출력 아님)")
+            count += 1
+    return count
 
 
 def main():
-    """메인: fx/ 디렉토리에 36개 이펙트 프레임 생성"""
+    """메인: fx/ 디렉토리에 36개 이펙트 프레임 생성 (바뀐 이펙트만)"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true", help="빌드 기록 무시하고 전부 다시 생성")
+    parser.add_argument("--workers", type=int, default=BUILD_WORKERS)
+    args = parser.parse_args()
+
     FX_DIR.mkdir(parents=True, exist_ok=True)
     print(f"🎨 이펙트 프레임 생성 시작 → {FX_DIR}")
     print(f"📁 소스 디렉토리: {EFFECTS_DIR}")
     print()
 
-    total = 0
+    # --force여도 지난 기록은 읽는다 (지난 빌드 출력 중 이제 안 만드는 파일을 지우기 위해)
+    build_cache = load_build_cache()
+
+    # 그래프 구성: 이펙트 → 소스 경로, 소스 sha256은 한 번씩만 계산
+    plans = {}
+    source_shas = {}
     for prefix, config in EFFECT_MAPPING.items():
         mode = config["mode"]
-        sources = config["sources"]
-        print(f"▶ {prefix} ({mode})")
+        paths = resolve_sources(mode, config["sources"])
+        if not any(paths):
+            print(f"▶ {prefix} ({mode})\n  ⚠️ 소스 없음: {config['sources']}\n")
+            continue
+        for p in paths:
+            if p and p not in source_shas:
+                source_shas[p] = file_sha256(p)
+        params = effect_params(mode, config)
+        plans[prefix] = (mode, paths, params, build_key(mode, params, paths, source_shas))
+
+    dirty = [prefix for prefix, (_, _, _, key) in plans.items()
+             if args.force or not is_fresh(build_cache.get(prefix), key)]
+    for prefix in plans:
+        if prefix not in dirty:
+            print(f"⏭️ {prefix} (변경 없음)")
 
-        if mode == "multi_source":
-            generate_multi_source(prefix, sources)
-        elif mode == "multi_source_fade":
-            generate_multi_source_fade(prefix, sources)
-        elif mode == "single_animate":
-            generate_single_animate(prefix, sources)
+    cache = SourceCache()
+    with ThreadPoolExecutor(args.workers) as pool:
+        # 1단계: 바뀐 이펙트가 쓰는 소스를 한 번씩 디코딩+리사이즈
+        needed = {p for prefix in dirty for p in plans[prefix][1] if p}
+        list(pool.map(cache.get, needed))
+        # 2단계: 이펙트끼리는 독립 → 병렬 렌더링
+        futures = {prefix: pool.submit(render_effect, prefix, *plans[prefix][:3], cache)
+                   for prefix in dirty}
 
-        total += 4
+    total = removed = 0
+    for prefix in dirty:
+        outputs, lines = futures[prefix].result()
+        print(f"▶ {prefix} ({plans[prefix][0]})")
+        print("\n".join(lines))
         print()
+        old = build_cache.get(prefix, {}).get("outputs", {})
+        removed += remove_stale(old, outputs)
+        build_cache[prefix] = {"key": plans[prefix][3], "outputs": outputs}
+        total += len(outputs)
+    # EFFECT_MAPPING에서 빠진 이펙트의 지난 출력도 정리
+    for prefix in [p for p in build_cache if p not in EFFECT_MAPPING]:
+        removed += remove_stale(build_cache.pop(prefix).get("outputs", {}), {})
+    save_build_cache(build_cache)
 
-    print(f"🎉 총 {total}개 프레임 생성 완료!")
+    print(f"🎉 총 {total}개 프레임 생성 완료! "
+          f"(이펙트 {len(dirty)}개 다시 생성 / {len(plans) - len(dirty)}개 건너뜀, 소스 디코딩 {cache.decoded}회)")
+    if removed:
+        print(f"🧹 지난 빌드에만 있던 프레임 {removed}개 삭제")
 
     # 결과 확인
     generated = list(FX_DIR.glob("*.png"))
@@ -2,10 +2,8 @@ import os
 import sys
 import json
 import base64
-import requests
 import time
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from vertex_client import get_client
 
 # ── 설정값 ──
 KEY_PATH = r"d:\00_Project\05_Defense\autotrade-engine-key.json"
@@ -15,18 +13,6 @@ MODEL_ID = "imagen-3.0-generate-001"
 
 OUTPUT_DIR = r"d:\00_Project\05_Defense\assets\images"
 
-def get_access_token():
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            KEY_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"]
-        )
-        request = Request()
-        credentials.refresh(request)
-        return credentials.token
-    except Exception as e:
-        print(f"❌ 토큰 발급 오류 (JSON 키 확인 필요): {e}")
-        return None
-
 def generate_image(prompt, output_filename):
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
@@ -34,34 +20,10 @@ def generate_image(prompt, output_filename):
     print(f"🎨 이미지 생성 요청 중: {output_filename} ...")
     print(f"프롬프트: {prompt}")
     
-    token = get_access_token()
-    if not token:
-        return False
-
-    url = f"https://{LOCATION}-aiplatform.googleapis.com/v1/projects/{PROJECT_ID}/locations/{LOCATION}/publishers/google/models/{MODEL_ID}:predict"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "instances": [
-            {
-                "prompt": prompt
-            }
-        ],
-        "parameters": {
-            "sampleCount": 1,
-            "aspectRatio": "1:1",
-            "outputOptions": {
-                "mimeType": "image/png"
-            }
-        }
-    }
+    client = get_client(KEY_PATH, PROJECT_ID, LOCATION, MODEL_ID)
     
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = client.predict(prompt, "1:1")
         
         if response.status_code == 200:
             data = response.json()
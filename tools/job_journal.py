@@ -0,0 +1,128 @@
+"""
+🦉 해원의 문 — 에셋 생성 작업 저널 (SQLite)
+
+생성 스크립트(bulk_imagen_v2 / bulk_imagen / rebuild_all_assets)가 작업마다
+상태·시도 횟수·지연·바이트·오류를 기록한다.
+  - 재시작 시 'done' + 파일 존재인 작업만 스킵 → 중단 지점부터 정확히 재개
+  - 이미지 저장은 임시 파일 → rename (반쯤 쓰인 파일이 완료로 보이지 않음)
+  - 카테고리별 처리량 통계 출력
+
+사용법:
+  python tools/job_journal.py          → 저널 통계 출력
+"""
+import os
+import sys
+import time
+import sqlite3
+import threading
+
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".imagen_journal.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    path     TEXT PRIMARY KEY,   -- 출력 파일 전체 경로
+    category TEXT,               -- bg / heroes / effects ...
+    state    TEXT,               -- running / done / failed
+    runs     INTEGER DEFAULT 0,  -- 작업 실행 횟수 (재개 포함)
+    requests INTEGER DEFAULT 0,  -- 누적 API 요청 수 (재시도 포함)
+    latency  REAL,               -- 마지막 실행 소요 초
+    bytes    INTEGER,            -- 저장된 파일 크기
+    error    TEXT,               -- 마지막 실패 사유
+    started  REAL,
+    finished REAL
+)
+"""
+
+
+class JobJournal:
+    """작업 상태 저널 (여러 워커 스레드에서 공유)"""
+
+    def __init__(self, path=JOURNAL_PATH):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(SCHEMA)
+        self.lock = threading.Lock()
+
+    def _exec(self, sql, args=()):
+        with self.lock:
+            return self.conn.execute(sql, args).fetchall()
+
+    def state(self, path):
+        rows = self._exec("SELECT state FROM jobs WHERE path = ?", (path,))
+        return rows[0][0] if rows else None
+
+    def is_done(self, path):
+        """완료 기록 + 파일 존재. 기록 없는 기존 파일(저널 도입 전)도 완료로 본다."""
+        if not os.path.exists(path):
+            return False
+        return self.state(path) in (None, "done")
+
+    def start(self, path, category):
+        now = time.time()
+        self._exec("""INSERT INTO jobs (path, category, state, runs, started) VALUES (?, ?, 'running', 1, ?)
+                      ON CONFLICT(path) DO UPDATE SET state = 'running', runs = runs + 1,
+                      started = excluded.started, error = NULL""", (path, category, now))
+
+    def finish(self, path, requests=0):
+        now = time.time()
+        size = os.path.getsize(path)
+        self._exec("""UPDATE jobs SET state = 'done', requests = requests + ?, bytes = ?,
+                      finished = ?, latency = ? - started WHERE path = ?""",
+                   (requests, size, now, now, path))
+
+    def fail(self, path, error, requests=0):
+        now = time.time()
+        self._exec("""UPDATE jobs SET state = 'failed', requests = requests + ?, error = ?,
+                      finished = ?, latency = ? - started WHERE path = ?""",
+                   (requests, str(error)[:500], now, now, path))
+
+    def records(self, state=None):
+        """작업별 (path, category, state, runs, requests, latency) 목록"""
+        sql = "SELECT path, category, state, runs, requests, latency FROM jobs"
+        if state:
+            return self._exec(sql + " WHERE state = ?", (state,))
+        return self._exec(sql)
+
+    def stats(self):
+        """카테고리별 (category, done, failed, runs, requests, avg_latency, bytes, span_sec)"""
+        return self._exec("""SELECT category,
+                                    SUM(state = 'done'), SUM(state = 'failed'),
+                                    SUM(runs), SUM(requests), AVG(latency),
+                                    SUM(COALESCE(bytes, 0)),
+                                    MAX(finished) - MIN(started)
+                             FROM jobs GROUP BY category ORDER BY category""")
+
+    def print_stats(self):
+        rows = self.stats()
+        if not rows:
+            print("📒 저널 기록 없음")
+            return
+        print(f"{'카테고리':<10} {'완료':>5} {'실패':>5} {'실행':>5} {'요청':>5} "
+              f"{'평균초':>7} {'MB':>7} {'개/분':>6}")
+        for cat, done, failed, runs, reqs, lat, size, span in rows:
+            rate = done / span * 60 if span else 0.0
+            print(f"{cat:<10} {done or 0:>5} {failed or 0:>5} {runs or 0:>5} {reqs or 0:>5} "
+                  f"{lat or 0:>7.1f} {size / 1e6:>7.1f} {rate:>6.1f}")
+        errors = self._exec("SELECT path, error FROM jobs WHERE state = 'failed'")
+        for path, error in errors:
+            print(f"  ❌ {os.path.basename(path)}: {error}")
+
+
+def save_atomic(fp, img=None, data=None):
+    """PIL 이미지 또는 바이트를 임시 파일에 쓴 뒤 rename"""
+    tmp = f"{fp}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if img is not None:
+        img.save(tmp, "PNG")
+    else:
+        with open(tmp, "wb") as f:
+            f.write(data)
+    os.replace(tmp, fp)
+
+
+def category_of(rel_path):
+    """'heroes/x.png' → 'heroes'"""
+    return rel_path.replace("\\", "/").split("/")[0]
+
+
+if __name__ == "__main__":
+    JobJournal(sys.argv[1] if len(sys.argv) > 1 else JOURNAL_PATH).print_stats()
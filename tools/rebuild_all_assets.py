@@ -6,13 +6,12 @@ Phase 3: 추가 배경/UI 에셋 생성
 import os
 import sys
 import base64
-import requests
 import time
 from io import BytesIO
 from PIL import Image
-from rembg import remove
-from google.oauth2 import service_account
-from google.auth.transport.requests import Request
+from bg_worker import remove_background
+from vertex_client import get_client
+from job_journal import JobJournal, save_atomic, category_of
 
 KEY_PATH = r"d:\00_Project\05_Defense\autotrade-engine-key.json"
 PROJECT_ID = "autotrade-engine"
@@ -209,40 +208,23 @@ print(f"📋 총 {len(ASSET_JOBS)}개 에셋 생성 대기열")
 # ==============================
 # 생성 함수
 # ==============================
-def get_access_token():
-    try:
-        credentials = service_account.Credentials.from_service_account_file(
-            KEY_PATH, scopes=["https://www.googleapis.com/auth/cloud-platform"]
-        )
-        request = Request()
-        credentials.refresh(request)
-        return credentials.token
-    except Exception as e:
-        print(f"토큰 오류: {e}")
-        return None
-
-def generate_image(prompt, output_filepath, remove_bg):
+def generate_image(prompt, output_filepath, remove_bg, stats=None):
+    """stats(dict)가 주어지면 요청 수/실패 사유를 기록"""
+    stats = stats if stats is not None else {}
     full_path = os.path.join(BASE_DIR, output_filepath)
     os.makedirs(os.path.dirname(full_path), exist_ok=True)
 
     print(f"🎨 생성 중: {output_filepath}")
-    token = get_access_token()
-    if not token:
-        return False
-
-    url = f"https://{LOCATION}-aiplatform.googleapis.com/v1/projects/{PROJECT_ID}/locations/{LOCATION}/publishers/google/models/{MODEL_ID}:predict"
-    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    payload = {
-        "instances": [{"prompt": prompt}],
-        "parameters": {"sampleCount": 1, "aspectRatio": "1:1", "outputOptions": {"mimeType": "image/png"}}
-    }
+    client = get_client(KEY_PATH, PROJECT_ID, LOCATION, MODEL_ID)
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        stats["requests"] = stats.get("requests", 0) + 1
+        response = client.predict(prompt, "1:1")
         if response.status_code == 200:
             data = response.json()
             predictions = data.get("predictions", [])
             if not predictions:
+                stats["error"] = "결과 없음"
                 print(f"  결과 없음")
                 return False
             b64_img = predictions[0].get("bytesBase64Encoded")
@@ -251,16 +233,18 @@ def generate_image(prompt, output_filepath, remove_bg):
                 if remove_bg:
                     print(f"  ✂️ 배경 투명화...")
                     input_img = Image.open(BytesIO(img_data))
-                    output_img = remove(input_img)
-                    output_img.save(full_path, "PNG")
+                    output_img = remove_background(input_img)
+                    save_atomic(full_path, img=output_img)
                 else:
-                    with open(full_path, "wb") as f:
-                        f.write(img_data)
+                    save_atomic(full_path, data=img_data)
                 print(f"  ✅ 저장: {full_path}")
                 return True
+            stats["error"] = "bytesBase64Encoded 없음"
         else:
+            stats["error"] = f"API 오류 ({response.status_code})"
             print(f"  ❌ API 오류 ({response.status_code})")
     except Exception as e:
+        stats["error"] = str(e)
         print(f"  🚨 예외: {e}")
     return False
 
@@ -271,20 +255,27 @@ print("\n" + "=" * 50)
 print("🦉 해원의 문 — 전체 그래픽 리빌드 팩토리 가동!")
 print("=" * 50)
 
+journal = JobJournal()
 success = 0
 skipped = 0
 for i, job in enumerate(ASSET_JOBS, 1):
     full_path = os.path.join(BASE_DIR, job["filepath"])
-    if os.path.exists(full_path):
+    if journal.is_done(full_path):
         print(f"⏭️ [{i}/{len(ASSET_JOBS)}] {job['filepath']} 이미 존재")
         skipped += 1
         continue
 
     print(f"\n[{i}/{len(ASSET_JOBS)}]")
-    if generate_image(job["prompt"], job["filepath"], job["remove_bg"]):
+    journal.start(full_path, category_of(job["filepath"]))
+    stats = {}
+    if generate_image(job["prompt"], job["filepath"], job["remove_bg"], stats):
+        journal.finish(full_path, stats.get("requests", 0))
         success += 1
+    else:
+        journal.fail(full_path, stats.get("error", "생성 실패"), stats.get("requests", 0))
     print("⏳ 60초 대기...")
     time.sleep(60)
 
 print("\n" + "=" * 50)
 print(f"🎉 완료! 성공: {success}, 스킵: {skipped}, 총: {len(ASSET_JOBS)}")
+journal.print_stats()
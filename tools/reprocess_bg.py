@@ -1,53 +1,160 @@
 """reprocess_bg.py v9: rembg AI 기반 정밀 배경 제거
-isnet-anime 모델 (애니/게임 캐릭터 최적화) + alpha_matting (경계면 매끄럽게)"""
-import os, glob, sys
+isnet-anime 모델 (애니/게임 캐릭터 최적화) + alpha_matting (경계면 매끄럽게)
+
+매팅 모드:
+  band (기본): 세그멘테이션 마스크 경계 ±BAND_WIDTH px 밴드에서만 매팅을 풀고
+               나머지는 하드 마스크 그대로 사용 → 전체 매팅보다 훨씬 빠름
+  full       : rembg 기본 알파 매팅 (이미지 전체)
+
+사용법:
+  python tools/reprocess_bg.py                    → heroes
+  python tools/reprocess_bg.py heroes enemies     → 여러 폴더 (워커 프로세스에 분배)
+  python tools/reprocess_bg.py --procs 2 heroes   → 워커 2개
+  python tools/reprocess_bg.py --matting full     → 전체 매팅
+  python tools/reprocess_bg.py --compare heroes   → band/full 알파 차이 + 시간 비교 (저장 안 함)"""
+import os, glob, time, argparse
+from functools import partial
 from PIL import Image
-from rembg import remove, new_session
+import numpy as np
+from scipy.ndimage import distance_transform_edt, label, find_objects
+from bg_worker import remove_background, run_pool, PROCS, BATCH
 
 BASE = r"e:\defense\assets\images"
 
-# isnet-anime: 애니/게임 캐릭터에 최적화된 모델
-print("🦉 rembg isnet-anime 모델 로딩 중...")
-SESSION = new_session("isnet-anime")
-print("✅ 모델 로딩 완료!")
+# isnet-anime: 애니/게임 캐릭터에 최적화된 모델 (워커 프로세스마다 한 번 로드)
+MODEL = "isnet-anime"
+
+# 알파 매팅 설정 (rembg alpha_matting_* 값과 동일)
+FG_THRESHOLD = 240
+BG_THRESHOLD = 20
+ERODE_SIZE   = 10
+MATTING      = "band"
+BAND_WIDTH   = 6     # band 모드: 마스크 경계 양쪽 몇 px까지만 매팅으로 풀지
+BAND_PAD     = 8     # 밴드 바깥 확정 영역 여유 (매팅 크롭 범위)
+
+def band_trimap(mask, width=BAND_WIDTH):
+    """마스크(0~255) → 경계 밴드 trimap: >= FG_THRESHOLD 전경(255), <= BG_THRESHOLD 배경(0),
+    그 사이 값과 하드 경계(>= 128)에서 width px 이내는 미지(128)"""
+    hard = mask >= 128
+    dist = np.where(hard, distance_transform_edt(hard), distance_transform_edt(~hard))
+    trimap = np.full(mask.shape, 128, dtype=np.uint8)
+    trimap[mask >= FG_THRESHOLD] = 255
+    trimap[mask <= BG_THRESHOLD] = 0
+    trimap[dist <= width] = 128
+    return trimap
+
+def band_matting(img, mask, width=BAND_WIDTH):
+    """경계 밴드에서만 closed-form 매팅 + 전경색 추정.
+    미지 영역을 연결 성분별로 나눠 성분마다 BAND_PAD 여유를 둔 작은 크롭으로 풀고,
+    그 성분 픽셀에만 결과를 쓴다. 크롭 안에 전경/배경 확정 픽셀이 둘 다 없으면 풀지 않고
+    하드 마스크 알파를 쓴다. 밴드 밖 픽셀은 trimap 알파와 원본 색을 그대로 쓴다."""
+    from pymatting.alpha.estimate_alpha_cf import estimate_alpha_cf
+    from pymatting.foreground.estimate_foreground_ml import estimate_foreground_ml
+
+    mask = np.asarray(mask)
+    rgb = np.asarray(img.convert("RGB"), dtype=np.float64) / 255.0
+    trimap = band_trimap(mask, width)
+    unknown = trimap == 128
+    alpha = np.where(unknown, mask >= 128, trimap == 255).astype(np.float64)
+    fg = rgb.copy()
+    labels, _ = label(unknown)
+    h, w = trimap.shape
+    for i, (sy, sx) in enumerate(find_objects(labels), 1):
+        y0, y1 = max(0, sy.start - BAND_PAD), min(h, sy.stop + BAND_PAD)
+        x0, x1 = max(0, sx.start - BAND_PAD), min(w, sx.stop + BAND_PAD)
+        crop_tri = trimap[y0:y1, x0:x1]
+        if not ((crop_tri == 255).any() and (crop_tri == 0).any()):
+            continue
+        crop_rgb = rgb[y0:y1, x0:x1]
+        crop_alpha = estimate_alpha_cf(crop_rgb, crop_tri / 255.0)
+        crop_fg = estimate_foreground_ml(crop_rgb, crop_alpha)
+        own = labels[y0:y1, x0:x1] == i
+        alpha[y0:y1, x0:x1][own] = crop_alpha[own]
+        fg[y0:y1, x0:x1][own] = crop_fg[own]
+    out = np.dstack([fg, alpha])
+    return Image.fromarray(np.clip(out * 255, 0, 255).astype(np.uint8), "RGBA")
 
-def make_transparent(img):
-    """rembg AI 기반 정밀 배경 제거"""
+def make_transparent(img, matting=MATTING, band=BAND_WIDTH):
+    """rembg AI 기반 정밀 배경 제거 (matting: band / full)"""
     img = img.convert("RGBA")
-    result = remove(
+    if matting == "band":
+        mask = remove_background(img, MODEL, only_mask=True)
+        return band_matting(img, mask, band)
+    result = remove_background(
         img,
-        session=SESSION,
+        MODEL,
         alpha_matting=True,
-        alpha_matting_foreground_threshold=240,
-        alpha_matting_background_threshold=20,
-        alpha_matting_erode_size=10,
+        alpha_matting_foreground_threshold=FG_THRESHOLD,
+        alpha_matting_background_threshold=BG_THRESHOLD,
+        alpha_matting_erode_size=ERODE_SIZE,
     )
     return result
 
-# 처리할 폴더 (인자로 지정 가능)
-if len(sys.argv) > 1:
-    folders = sys.argv[1:]
-else:
-    folders = ["heroes"]
-
-count = 0
-for folder in folders:
-    path = os.path.join(BASE, folder)
-    if not os.path.exists(path):
-        print(f"⚠️ {folder} 폴더 없음, 스킵")
-        continue
-    files = sorted(glob.glob(os.path.join(path, "*.png")))
-    print(f"\n📂 {folder} ({len(files)}개)")
-    for f in files:
-        name = os.path.relpath(f, BASE)
-        print(f"  재처리: {name}", end=" ... ", flush=True)
-        try:
-            img = Image.open(f)
-            img = make_transparent(img)
-            img.save(f, "PNG")
-            print("✅")
-            count += 1
-        except Exception as e:
-            print(f"❌ {e}")
-
-print(f"\n🎉 {count}개 파일 재처리 완료!")
+def compare_file(f, band=BAND_WIDTH):
+    """워커에서 실행: band/full 결과 알파 차이 + 시간 → (이름, 평균 차이, 최대 차이, band초, full초)"""
+    img = Image.open(f)
+    img.load()
+    t = time.perf_counter()
+    banded = make_transparent(img, "band", band)
+    t_band = time.perf_counter() - t
+    t = time.perf_counter()
+    full = make_transparent(img, "full")
+    t_full = time.perf_counter() - t
+    diff = np.abs(np.asarray(banded.getchannel("A"), dtype=np.int16) -
+                  np.asarray(full.getchannel("A"), dtype=np.int16))
+    return os.path.relpath(f, BASE), float(diff.mean()), int(diff.max()), t_band, t_full
+
+def reprocess_file(f, matting=MATTING, band=BAND_WIDTH):
+    """워커에서 실행: 파일 1개 재처리 → 성공 여부"""
+    name = os.path.relpath(f, BASE)
+    try:
+        img = Image.open(f)
+        img = make_transparent(img, matting, band)
+        img.save(f, "PNG")
+        print(f"  재처리: {name} ... ✅", flush=True)
+        return True
+    except Exception as e:
+        print(f"  재처리: {name} ... ❌ {e}", flush=True)
+        return False
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folders", nargs="*", default=["heroes"], help="처리할 폴더 (기본 heroes)")
+    parser.add_argument("--procs", type=int, default=PROCS, help=f"워커 프로세스 수 (기본 {PROCS})")
+    parser.add_argument("--batch", type=int, default=BATCH, help=f"워커 작업당 파일 수 (기본 {BATCH})")
+    parser.add_argument("--matting", choices=["band", "full"], default=MATTING,
+                        help=f"알파 매팅 범위 (기본 {MATTING})")
+    parser.add_argument("--band", type=int, default=BAND_WIDTH,
+                        help=f"band 매팅 밴드 반폭 px (기본 {BAND_WIDTH})")
+    parser.add_argument("--compare", action="store_true", help="band/full 비교만 (저장 안 함)")
+    args = parser.parse_args()
+
+    files = []
+    for folder in args.folders:
+        path = os.path.join(BASE, folder)
+        if not os.path.exists(path):
+            print(f"⚠️ {folder} 폴더 없음, 스킵")
+            continue
+        found = sorted(glob.glob(os.path.join(path, "*.png")))
+        print(f"📂 {folder} ({len(found)}개)")
+        files.extend(found)
+
+    if args.compare:
+        rows = run_pool(partial(compare_file, band=args.band), files, model=MODEL, procs=args.procs, batch=args.batch)
+        for name, mean, peak, t_band, t_full in rows:
+            print(f"  {name}: 알파 차이 평균 {mean:.2f} / 최대 {peak} | "
+                  f"band {t_band:.1f}초 ↔ full {t_full:.1f}초")
+        if rows:
+            total_band = sum(r[3] for r in rows)
+            total_full = sum(r[4] for r in rows)
+            print(f"\n📊 평균 알파 차이 {np.mean([r[1] for r in rows]):.2f} | "
+                  f"시간 band {total_band:.1f}초 ↔ full {total_full:.1f}초 (x{total_full / total_band:.1f})")
+        return
+
+    print(f"\n🦉 rembg {MODEL} ({args.matting} 매팅) — {len(files)}개, 워커 {args.procs}개 (각자 모델 1회 로딩)")
+    results = run_pool(partial(reprocess_file, matting=args.matting, band=args.band), files,
+                       model=MODEL, procs=args.procs, batch=args.batch)
+    print(f"\n🎉 {sum(results)}개 파일 재처리 완료!")
+
+if __name__ == "__main__":
+    main()
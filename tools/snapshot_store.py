@@ -0,0 +1,248 @@
+"""
+🦉 해원의 문 — 에셋 스냅샷 저장소 (변경 파일만, 내용 해시로 중복 제거)
+
+폴더 통째 shutil 백업 대신, 스크립트가 파일을 덮어쓰기 직전에 그 파일만 기록한다.
+  .asset_snapshots/objects/ab/abcdef....png   원본 바이트 (sha256, 같은 내용은 한 번만 저장)
+  .asset_snapshots/snapshots/<이름>.json      상대 경로 → sha256 목록
+
+  - 객체는 임시 파일 → rename으로 만들고 읽기 전용으로 둔다 (이후 수정 불가)
+  - export는 객체를 하드링크로 펼쳐서 디스크를 더 쓰지 않는다
+  - restore는 객체를 복사해서 되돌린다 (복원된 에셋을 고쳐도 저장소는 안전)
+
+사용법:
+  python tools/snapshot_store.py list
+  python tools/snapshot_store.py show <이름>
+  python tools/snapshot_store.py restore <이름> [--only heroes]
+  python tools/snapshot_store.py export <이름> <폴더>        → 하드링크로 펼쳐 보기
+  python tools/snapshot_store.py import assets/images_backup  → 기존 통째 백업을 스냅샷으로
+  python tools/snapshot_store.py gc                           → 어느 스냅샷도 안 쓰는 객체 삭제
+
+코드에서:
+  snap = SnapshotStore().begin("remove_bg", ASSETS_DIR)
+  snap.add(filepath)       # 덮어쓰기 직전
+  snap.commit()            # 기록한 파일이 있으면 목록 저장
+"""
+import os
+import sys
+import json
+import stat
+import time
+import shutil
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+
+STORE_DIR = Path(__file__).resolve().parent.parent / ".asset_snapshots"
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets" / "images"
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _rel(path, base):
+    return Path(os.path.relpath(path, base)).as_posix()
+
+
+class SnapshotStore:
+    """내용 주소 객체 + 스냅샷 목록 (여러 프로세스가 동시에 put 해도 안전)"""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.snapshots = self.root / "snapshots"
+
+    def object_path(self, sha):
+        return self.objects / sha[:2] / f"{sha}.png"
+
+    def put(self, path):
+        """파일 내용을 객체로 저장 (이미 있으면 복사 생략) → sha256"""
+        sha = file_sha256(path)
+        obj = self.object_path(sha)
+        if not obj.exists():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp = obj.with_name(f"{obj.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copyfile(path, tmp)
+            os.chmod(tmp, stat.S_IREAD)
+            try:
+                os.replace(tmp, obj)
+            except OSError:
+                # 다른 워커가 같은 내용을 먼저 넣음 (Windows는 읽기 전용 대상을 교체 못 함)
+                # → 이미 있는 객체를 그대로 쓰고 임시 파일만 지운다
+                if not obj.exists():
+                    raise
+                os.chmod(tmp, stat.S_IREAD | stat.S_IWRITE)
+                os.remove(tmp)
+        return sha
+
+    def begin(self, tool, base=ASSETS_DIR):
+        return Snapshot(self, tool, base)
+
+    def save(self, tool, base, files):
+        """스냅샷 목록 저장 → 이름"""
+        self.snapshots.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{tool}"
+        n = 1
+        while (self.snapshots / f"{name}.json").exists():
+            n += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{tool}-{n}"
+        manifest = {"tool": tool, "created": time.time(), "base": str(Path(base).resolve()),
+                    "files": dict(sorted(files.items()))}
+        # 임시 파일에 다 쓴 뒤 교체: 중간에 죽어도 반쯤 쓰인 목록이 list/restore에 보이지 않음
+        tmp = self.snapshots / f"{name}.json.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.snapshots / f"{name}.json")
+        return name
+
+    def load(self, name):
+        with open(self.snapshots / f"{name}.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def names(self, tool=None):
+        """스냅샷 이름 (오래된 순)"""
+        if not self.snapshots.exists():
+            return []
+        names = sorted(p.stem for p in self.snapshots.glob("*.json"))
+        if tool:
+            names = [n for n in names if self.load(n)["tool"] == tool]
+        return names
+
+    def originals(self, tool):
+        """tool 스냅샷들을 합친 '처음 상태' — 경로마다 가장 오래된 기록 {rel: sha}"""
+        merged = {}
+        for name in self.names(tool):
+            for rel, sha in self.load(name)["files"].items():
+                merged.setdefault(rel, sha)
+        return merged
+
+    def restore_files(self, files, base, only=None):
+        """{rel: sha}를 base 아래로 복원 (복사 → rename), 복원한 개수"""
+        count = 0
+        for rel, sha in files.items():
+            if only and rel.split("/")[0] not in only:
+                continue
+            dst = Path(base) / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if dst.exists() and file_sha256(dst) == sha:
+                continue
+            tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+            shutil.copyfile(self.object_path(sha), tmp)
+            os.chmod(tmp, stat.S_IREAD | stat.S_IWRITE)
+            os.replace(tmp, dst)
+            count += 1
+        return count
+
+    def restore(self, name, base=None, only=None):
+        manifest = self.load(name)
+        return self.restore_files(manifest["files"], base or manifest["base"], only)
+
+    def export(self, name, out_dir):
+        """스냅샷을 하드링크로 펼침 (링크 불가한 파일시스템이면 복사)"""
+        for rel, sha in self.load(name)["files"].items():
+            dst = Path(out_dir) / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            if dst.exists():
+                continue
+            try:
+                os.link(self.object_path(sha), dst)
+            except OSError:
+                shutil.copyfile(self.object_path(sha), dst)
+
+    def import_dir(self, src, tool):
+        """기존 통째 백업 폴더 → 스냅샷 (같은 내용은 객체 하나)"""
+        files = {_rel(p, src): self.put(p) for p in sorted(Path(src).rglob("*.png"))}
+        return self.save(tool, ASSETS_DIR, files) if files else None
+
+    def gc(self):
+        """어느 스냅샷도 참조하지 않는 객체 삭제 → (삭제 수, 바이트)"""
+        used = {sha for n in self.names() for sha in self.load(n)["files"].values()}
+        removed = size = 0
+        for obj in self.objects.glob("*/*.png"):
+            if obj.stem not in used:
+                size += obj.stat().st_size
+                os.chmod(obj, stat.S_IREAD | stat.S_IWRITE)
+                obj.unlink()
+                removed += 1
+        return removed, size
+
+
+class Snapshot:
+    """한 번의 실행 동안 덮어쓸 파일을 모으는 스냅샷 (한 프로세스 안에서 사용)"""
+
+    def __init__(self, store, tool, base):
+        self.store = store
+        self.tool = tool
+        self.base = Path(base)
+        self.files = {}
+        self.lock = threading.Lock()
+
+    def add(self, path):
+        """덮어쓰기 직전에 호출 — 이번 실행에서 처음 건드리는 파일만 저장"""
+        rel = _rel(path, self.base)
+        with self.lock:
+            if rel in self.files:
+                return self.files[rel]
+        sha = self.store.put(path)
+        with self.lock:
+            self.files.setdefault(rel, sha)
+        return sha
+
+    def record(self, rel, sha):
+        """워커 프로세스에서 put()한 결과를 모을 때"""
+        with self.lock:
+            self.files.setdefault(rel, sha)
+
+    def commit(self):
+        """기록한 파일이 있으면 목록 저장 → 이름 (없으면 None)"""
+        if not self.files:
+            return None
+        return self.store.save(self.tool, self.base, self.files)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    p = sub.add_parser("show"); p.add_argument("name")
+    p = sub.add_parser("restore"); p.add_argument("name"); p.add_argument("--only", nargs="*")
+    p.add_argument("--base", default=None, help="복원 위치 (기본: 스냅샷을 뜬 폴더)")
+    p = sub.add_parser("export"); p.add_argument("name"); p.add_argument("out")
+    p = sub.add_parser("import"); p.add_argument("src"); p.add_argument("--tool", default="remove_bg")
+    sub.add_parser("gc")
+    args = parser.parse_args()
+    store = SnapshotStore()
+
+    if args.cmd == "list":
+        for name in store.names():
+            m = store.load(name)
+            size = sum(store.object_path(s).stat().st_size for s in set(m["files"].values()))
+            print(f"  📸 {name}  {m['tool']:<14} 파일 {len(m['files']):>4}개  {size / 1e6:>7.1f}MB")
+        objs = list(store.objects.glob("*/*.png")) if store.objects.exists() else []
+        print(f"\n📦 저장소 객체 {len(objs)}개, {sum(o.stat().st_size for o in objs) / 1e6:.1f}MB")
+    elif args.cmd == "show":
+        m = store.load(args.name)
+        print(f"📸 {args.name} ({m['tool']}, {time.strftime('%Y-%m-%d %H:%M', time.localtime(m['created']))})")
+        for rel, sha in m["files"].items():
+            print(f"  {rel}  {sha[:12]}")
+    elif args.cmd == "restore":
+        n = store.restore(args.name, args.base, args.only)
+        print(f"🔄 {args.name}: {n}개 복원")
+    elif args.cmd == "export":
+        store.export(args.name, args.out)
+        print(f"📂 {args.name} → {args.out}")
+    elif args.cmd == "import":
+        name = store.import_dir(args.src, args.tool)
+        print(f"📥 {args.src} → {name}" if name else "⚠️ PNG 없음")
+    elif args.cmd == "gc":
+        removed, size = store.gc()
+        print(f"🧹 객체 {removed}개 삭제 ({size / 1e6:.1f}MB)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+🦉 해원의 문 — Vertex AI Imagen 공용 클라이언트
+
+모든 이미지 생성 스크립트(bulk_imagen_v2 / bulk_imagen / imagen_generator /
+rebuild_all_assets)가 함께 쓰는 클라이언트:
+  ① keep-alive 커넥션 풀 세션 → 요청마다 TLS 핸드셰이크 생략
+  ② OAuth 토큰 캐시 → 만료 TOKEN_MARGIN_SEC초 전까지 재사용
+
+사용법:
+  from vertex_client import get_client
+  client = get_client(KEY_PATH)
+  r = client.predict(prompt, "1:1")   # requests.Response
+
+IMAGEN_ENDPOINT 환경변수(예: http://127.0.0.1:8765)를 주면 그 주소로 요청하고
+OAuth를 생략한다 — fake_imagen_server.py로 쿼터 없이 부하 테스트할 때 사용.
+
+스트리밍 디코딩:
+  client.predict(..., stream=True) + read_predictions(r)
+  → 응답 JSON 전체/base64 문자열을 메모리에 올리지 않고 청크 단위로 바로 디코딩
+
+재시도 도구:
+  backoff_delay()  → Retry-After 우선, 없으면 지수 백오프 + full jitter
+  CircuitBreaker   → 최근 오류율이 높으면 모든 요청을 잠시 멈춤 (스레드 공유)
+"""
+import os
+import time
+import base64
+import random
+import datetime
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from google.oauth2 import service_account
+from google.auth.transport.requests import Request
+
+# ━━ 기본 설정 ━━
+PROJECT_ID       = "autotrade-engine"
+LOCATION         = "us-central1"
+MODEL_ID         = "imagen-3.0-generate-001"
+SCOPES           = ["https://www.googleapis.com/auth/cloud-platform"]
+TOKEN_MARGIN_SEC = 300   # 만료 5분 전이면 미리 갱신
+POOL_SIZE        = 16    # 호스트당 keep-alive 커넥션 수
+ENDPOINT         = os.environ.get("IMAGEN_ENDPOINT", "")  # 로컬 대역 서버 주소
+RETRY_CAP_SEC    = 120   # 백오프 최대 대기
+RETRYABLE        = {429, 500, 502, 503, 504}
+STREAM_CHUNK     = 256 * 1024  # 스트리밍 디코딩 청크 (4의 배수)
+
+
+class VertexClient:
+    """커넥션 풀 세션 + 토큰 캐시를 가진 Imagen :predict 클라이언트 (스레드 안전)"""
+
+    def __init__(self, key_path, project_id=PROJECT_ID, location=LOCATION,
+                 model_id=MODEL_ID, pool_size=POOL_SIZE, endpoint=None):
+        self.key_path = key_path
+        self.endpoint = (endpoint if endpoint is not None else ENDPOINT).rstrip("/")
+        self.project_id = project_id
+        self.location = location
+        self.model_id = model_id
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._credentials = None
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        base = self.endpoint or f"https://{self.location}-aiplatform.googleapis.com"
+        return (f"{base}/v1/projects/"
+                f"{self.project_id}/locations/{self.location}/publishers/google/"
+                f"models/{self.model_id}:predict")
+
+    def _token_fresh(self):
+        c = self._credentials
+        if c is None or not c.token or c.expiry is None:
+            return False
+        # google-auth의 expiry는 tz 없는 UTC
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (c.expiry - now).total_seconds() > TOKEN_MARGIN_SEC
+
+    def token(self):
+        """캐시된 액세스 토큰 반환 (만료 임박 시에만 갱신)"""
+        if self.endpoint:
+            return "local"  # 로컬 대역 서버는 인증 없음
+        with self._lock:
+            if not self._token_fresh():
+                if self._credentials is None:
+                    self._credentials = service_account.Credentials.from_service_account_file(
+                        self.key_path, scopes=SCOPES)
+                self._credentials.refresh(Request(session=self.session))
+            return self._credentials.token
+
+    def predict(self, prompt, aspect="1:1", sample_count=1, timeout=120, stream=False):
+        """:predict 호출 — 응답 판정/재시도는 호출하는 쪽에서
+        stream=True면 본문을 읽지 않은 채 반환 (read_predictions()로 디코딩)"""
+        payload = {
+            "instances": [{"prompt": prompt}],
+            "parameters": {"sampleCount": sample_count, "aspectRatio": aspect,
+                           "outputOptions": {"mimeType": "image/png"}}
+        }
+        return self.session.post(self.url,
+            headers={"Authorization": f"Bearer {self.token()}",
+                     "Content-Type": "application/json"},
+            json=payload, timeout=timeout, stream=stream)
+
+
+def read_predictions(response, chunk_size=STREAM_CHUNK):
+    """:predict 스트리밍 응답 → 디코딩된 이미지 바이트 목록 [bytearray, ...]
+    JSON 전체를 파싱하지 않고 "bytesBase64Encoded" 값만 찾아 청크 단위로 base64 디코딩.
+    요청 1건의 최대 메모리 ≈ 이미지 크기 + 청크 크기."""
+    key = b'"bytesBase64Encoded"'
+    results = []
+    tail = b""       # 청크 경계에 걸친 키 조각
+    pending = b""    # 4글자 단위로 떨어지지 않은 base64 꼬리
+    out = None
+    state = "seek"   # seek: 키 탐색 → open: 값 시작 따옴표 → value: base64 본문
+    for chunk in response.iter_content(chunk_size):
+        data = tail + chunk
+        tail = b""
+        i = 0
+        while i < len(data):
+            if state == "seek":
+                k = data.find(key, i)
+                if k < 0:
+                    tail = data[max(i, len(data) - len(key) + 1):]
+                    break
+                i = k + len(key)
+                state = "open"
+            elif state == "open":
+                q = data.find(b'"', i)
+                if q < 0:
+                    break
+                i = q + 1
+                out = bytearray()
+                state = "value"
+            else:
+                q = data.find(b'"', i)
+                end = q if q >= 0 else len(data)
+                # base64 안의 JSON 이스케이프는 "\/"뿐 → 백슬래시 제거로 충분
+                piece = pending + data[i:end].replace(b"\\", b"")
+                n = len(piece) // 4 * 4
+                out += base64.b64decode(piece[:n])
+                pending = piece[n:]
+                if q < 0:
+                    break
+                if pending:
+                    out += base64.b64decode(pending + b"=" * (-len(pending) % 4))
+                    pending = b""
+                results.append(out)
+                out = None
+                state = "seek"
+                i = q + 1
+    return results
+
+
+# ━━ 재시도 / 서킷 브레이커 ━━
+def retry_after_sec(response):
+    """Retry-After 헤더(초 또는 HTTP 날짜) → 초 (없으면 None)"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, (when - datetime.datetime.now(when.tzinfo)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, retry_after=None, base=2.0, cap=RETRY_CAP_SEC):
+    """재시도 전 대기 초
+    서버 힌트가 있으면 그 값 + 최대 50% jitter, 없으면 full jitter 지수 백오프
+    (여러 워커/스크립트가 같은 박자로 몰리지 않게)"""
+    if retry_after is not None:
+        return min(cap, retry_after * (1 + random.uniform(0, 0.5)))
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """최근 window개 요청의 오류율이 threshold 이상이면 cooldown초 동안 차단.
+    차단이 반복되면 cooldown을 두 배씩 (max_cooldown까지) 늘리고,
+    차단 후 첫 성공에서 원래 값으로 되돌린다."""
+
+    def __init__(self, window=20, threshold=0.5, min_samples=6,
+                 cooldown=30.0, max_cooldown=300.0):
+        self.window = deque(maxlen=window)
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """차단 중이면 풀릴 때까지 대기, 대기한 초를 반환"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                remain = self.open_until - time.monotonic()
+            if remain <= 0:
+                return waited
+            time.sleep(remain)
+            waited += remain
+
+    def record(self, ok):
+        with self.lock:
+            self.window.append(bool(ok))
+            if ok:
+                if self.trips and self.open_until < time.monotonic():
+                    self.cooldown = self.base_cooldown
+                return
+            if len(self.window) < self.min_samples:
+                return
+            errors = self.window.count(False) / len(self.window)
+            if errors >= self.threshold and self.open_until < time.monotonic():
+                self.open_until = time.monotonic() + self.cooldown
+                self.trips += 1
+                print(f"  🛑 오류율 {errors:.0%} → 전체 요청 {self.cooldown:.0f}초 일시정지")
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self.window.clear()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(key_path, project_id=PROJECT_ID, location=LOCATION, model_id=MODEL_ID):
+    """설정별 공유 클라이언트 (프로세스당 하나의 세션/토큰)"""
+    key = (key_path, project_id, location, model_id)
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = VertexClient(key_path, project_id, location, model_id)
+        return _clients[key]